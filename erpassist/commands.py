@@ -0,0 +1,31 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import click
+import frappe
+from frappe.commands import pass_context
+from frappe.exceptions import SiteNotSpecifiedError
+
+@click.command("erpassist-sync-actions")
+@pass_context
+def erpassist_sync_actions(context):
+	"""
+	Sync ACTIONS_DATA into ERPAssist Action Registry
+	"""
+	from erpassist.erpassist.core.action_sync import sync_actions
+	
+	for site in context.sites:
+		try:
+			frappe.init(site=site)
+			frappe.connect()
+			frappe.set_user("Administrator")
+			
+			print(f"{site}:")
+			sync_actions(verbose=True)
+		finally:
+			frappe.destroy()
+	
+	if not context.sites:
+		raise SiteNotSpecifiedError
+
+commands = [erpassist_sync_actions]
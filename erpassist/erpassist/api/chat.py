@@ -4,17 +4,48 @@
 import frappe
 import json
 from frappe import _
-from erpassist.erpassist.core.orchestrator import AIOrchestrator
+from erpassist.erpassist.core.orchestrator_pool import get_orchestrator
 from erpassist.erpassist.core.audit_logger import AuditLogger
 
+TURN_EVENT = "erpassist_turn"
+ACTIVE_TURNS_KEY = "erpassist:turns:active"
+
+# Refreshed on every new turn; clears slots leaked by a worker that died
+# mid-turn once the site has been idle this long
+ACTIVE_TURNS_TTL = 15 * 60
+
 @frappe.whitelist()
-def send_message(message, session_id=None):
+def send_message(message, session_id=None, stream_id=None):
 	"""
 	Send a message to the AI assistant
+	Pass a client generated stream_id to receive the reply token by token
+	over the erpassist_stream realtime event
+
+	With background processing enabled (and a stream_id, so the client can
+	listen on realtime) the turn is queued and a turn_id is returned at once;
+	the reply arrives later on the erpassist_turn realtime event
 	"""
+	turn_reserved = False
+	
 	try:
 		user = frappe.session.user
 		
+		# Process with pooled AI Orchestrator
+		orchestrator = get_orchestrator()
+		background = stream_id and orchestrator.settings.enable_background_processing
+		
+		# Refuse a background turn before the message is saved, so a busy
+		# refusal doesn't leave an unanswered message in the session
+		if background:
+			if not reserve_turn(orchestrator.settings):
+				return {
+					"success": False,
+					"session_id": session_id,
+					"error": _("ERPAssist is busy right now. Please try again in a moment.")
+				}
+			
+			turn_reserved = True
+		
 		# Create or get session
 		if not session_id:
 			session = frappe.get_doc({
@@ -36,19 +67,15 @@ def send_message(message, session_id=None):
 		})
 		session.save()
 		
-		# Process with AI Orchestrator
-		orchestrator = AIOrchestrator()
-		response = orchestrator.process_message(message, session_id, user)
+		if background:
+			result = enqueue_turn(orchestrator.settings, message, session_id, user, stream_id)
+			turn_reserved = False
+			return result
+		
+		response = orchestrator.process_message(message, session_id, user, stream_id=stream_id)
 		
 		# Add assistant response to session
-		session.append("messages", {
-			"role": "assistant",
-			"message": response.get("message", ""),
-			"timestamp": frappe.utils.now(),
-			"action_taken": response.get("action_taken"),
-			"action_result": json.dumps(response.get("action_result"))
-		})
-		session.save()
+		_save_assistant_message(session, response)
 		
 		return {
 			"success": True,
@@ -57,12 +84,118 @@ def send_message(message, session_id=None):
 		}
 		
 	except Exception as e:
+		if turn_reserved:
+			release_turn()
+		
 		frappe.log_error(frappe.get_traceback(), "ERPAssist Chat Error")
 		return {
 			"success": False,
 			"error": str(e)
 		}
 
+def reserve_turn(settings):
+	"""
+	Take a background turn slot, False if max_queued_turns ERPAssist turns
+	are already queued or running
+	The count is ERPAssist's own: other jobs on the shared queue don't use
+	up slots, and a turn holds its slot until run_turn is done
+	"""
+	cache = frappe.cache()
+	key = cache.make_key(ACTIVE_TURNS_KEY)
+	
+	active = cache.incr(key)
+	cache.expire(key, ACTIVE_TURNS_TTL)
+	
+	if active > (settings.max_queued_turns or 50):
+		release_turn()
+		return False
+	
+	return True
+
+def release_turn():
+	cache = frappe.cache()
+	key = cache.make_key(ACTIVE_TURNS_KEY)
+	
+	if cache.decr(key) < 0:
+		cache.delete(key)
+
+def enqueue_turn(settings, message, session_id, user, stream_id=None):
+	"""
+	Queue a chat turn for a background worker and return its turn id
+	The caller must hold a slot from reserve_turn; run_turn releases it
+	"""
+	turn_id = frappe.generate_hash(length=12)
+	
+	frappe.enqueue(
+		"erpassist.erpassist.api.chat.run_turn",
+		queue=settings.background_queue or "default",
+		job_id=f"erpassist-turn-{turn_id}",
+		enqueue_after_commit=True,
+		message=message,
+		session_id=session_id,
+		user=user,
+		turn_id=turn_id,
+		stream_id=stream_id
+	)
+	
+	# The job is only queued on commit; a rolled back request never runs it
+	frappe.db.after_rollback.add(release_turn)
+	
+	return {
+		"success": True,
+		"session_id": session_id,
+		"turn_id": turn_id,
+		"queued": True
+	}
+
+def run_turn(message, session_id, user, turn_id, stream_id=None):
+	"""
+	Background job: process a queued chat turn and push the result over realtime
+	"""
+	try:
+		frappe.set_user(user)
+		
+		orchestrator = get_orchestrator()
+		response = orchestrator.process_message(message, session_id, user, stream_id=stream_id)
+		
+		session = frappe.get_doc("ERPAssist Chat Session", session_id)
+		_save_assistant_message(session, response)
+		frappe.db.commit()
+		
+		result = {
+			"success": True,
+			"session_id": session_id,
+			"response": response
+		}
+		
+	except Exception as e:
+		frappe.log_error(frappe.get_traceback(), "ERPAssist Background Turn Error")
+		result = {
+			"success": False,
+			"session_id": session_id,
+			"error": str(e)
+		}
+	
+	finally:
+		release_turn()
+	
+	result["turn_id"] = turn_id
+	frappe.publish_realtime(TURN_EVENT, json.loads(frappe.as_json(result)), user=user)
+
+def _save_assistant_message(session, response):
+	"""
+	Append the assistant response to the session and save it
+	"""
+	session.append("messages", {
+		"role": "assistant",
+		"message": response.get("message", ""),
+		"timestamp": frappe.utils.now(),
+		"action_taken": (response.get("action_taken") or "")[:140] or None,
+		"action_result": json.dumps(response.get("action_result")),
+		"step_timings": json.dumps(response.get("steps")) if response.get("steps") else None
+	})
+	session.save()
+
 @frappe.whitelist()
 def get_sessions():
 	"""
@@ -117,7 +250,7 @@ def confirm_action(session_id, action_name, parameters):
 	"""
 	try:
 		user = frappe.session.user
-		orchestrator = AIOrchestrator()
+		orchestrator = get_orchestrator()
 		
 		# Parse parameters if it's a string
 		if isinstance(parameters, str):
@@ -145,3 +278,104 @@ def confirm_action(session_id, action_name, parameters):
 			"success": False,
 			"error": str(e)
 		}
+
+@frappe.whitelist()
+def get_intent_stats():
+	"""
+	Get intent fast-path coverage
+	"""
+	frappe.only_for("System Manager")
+	
+	from erpassist.erpassist.core.intent_matcher import IntentMatcher
+	
+	return {
+		"success": True,
+		"stats": IntentMatcher.get_stats()
+	}
+
+@frappe.whitelist()
+def get_coalescing_stats():
+	"""
+	Get request coalescing counters
+	"""
+	frappe.only_for("System Manager")
+	
+	from erpassist.erpassist.core.single_flight import SingleFlight
+	
+	return {
+		"success": True,
+		"stats": SingleFlight.get_stats()
+	}
+
+@frappe.whitelist()
+def get_handler_report():
+	"""
+	List the handler path of every enabled action and whether it resolves
+	"""
+	frappe.only_for("System Manager")
+	
+	report = get_orchestrator().action_registry.get_handler_report()
+	
+	return {
+		"success": True,
+		"broken": [row for row in report if not row["valid"]],
+		"report": report
+	}
+
+@frappe.whitelist()
+def get_audit_result(audit_log):
+	"""
+	Get the full result of an audit log entry, also when it is stored as a digest
+	"""
+	frappe.only_for("System Manager")
+	
+	from erpassist.erpassist.core.audit_payload import read_blob
+	
+	entry = frappe.db.get_value("ERPAssist Audit Log", audit_log, ["result", "result_blob"], as_dict=True)
+	if not entry:
+		frappe.throw(_("Audit log {0} not found").format(audit_log), frappe.DoesNotExistError)
+	
+	return {
+		"success": True,
+		"result": json.loads(read_blob(entry.result_blob) if entry.result_blob else entry.result or "null")
+	}
+
+@frappe.whitelist()
+def get_archived_audit_log(from_date=None, to_date=None, user=None, action_name=None, limit=100):
+	"""
+	Search audit log entries that were moved to the monthly archive files
+	"""
+	frappe.only_for("System Manager")
+	
+	from erpassist.erpassist.core.audit_archive import read_archive
+	
+	filters = {}
+	if user:
+		filters["user"] = user
+	if action_name:
+		filters["action_name"] = action_name
+	
+	entries = []
+	for row in read_archive(from_date, to_date, filters):
+		entries.append(row)
+		if len(entries) >= int(limit):
+			break
+	
+	return {
+		"success": True,
+		"entries": entries
+	}
+
+@frappe.whitelist()
+def get_response_cache_stats():
+	"""
+	Get response cache hit/miss counters
+	"""
+	frappe.only_for("System Manager")
+	
+	from erpassist.erpassist.core.response_cache import ResponseCache
+	
+	return {
+		"success": True,
+		"stats": ResponseCache.get_stats()
+	}
@@ -3,6 +3,16 @@
 
 import frappe
 import json
+from erpassist.erpassist.core.executor import validate_handlers, get_handler_report
+
+REGISTRY_VERSION_KEY = "erpassist:action_registry:version"
+REGISTRY_CACHE_KEY = "erpassist:action_registry:compiled"
+
+# Compiled registries are dropped from Redis a day after they were last built
+REGISTRY_CACHE_TTL = 24 * 60 * 60
+
+# site -> (registry version, compiled registry)
+_local_registry = {}
 
 class ActionRegistry:
 	"""
@@ -11,29 +21,20 @@ class ActionRegistry:
 	"""
 	
 	def __init__(self):
-		self.actions = {}
-		self._load_actions()
-	
-	def _load_actions(self):
-		"""
-		Load all enabled actions from ERPAssist Action Registry
-		"""
-		actions = frappe.get_all(
-			"ERPAssist Action Registry",
-			filters={"enabled": 1},
-			fields=["*"]
-		)
+		registry = get_compiled_registry()
+		self.actions = registry.actions
 		
-		for action in actions:
-			# Load allowed roles
-			roles = frappe.get_all(
-				"ERPAssist Action Role",
-				filters={"parent": action.name},
-				fields=["role"]
-			)
-			action["allowed_roles"] = [r.role for r in roles]
-			
-			self.actions[action.action_name] = action
+		# Inverted index: bit i of a mask stands for action_names[i]
+		self.action_names = registry.action_names
+		self.action_bits = registry.action_bits
+		self.role_masks = registry.role_masks
+		self.unrestricted_mask = registry.unrestricted_mask
+		
+		# action name -> why its handler path does not resolve
+		self.handler_errors = registry.handler_errors
+		
+		# role set -> mask of the actions it may use
+		self.role_set_masks = {}
 	
 	def get_action(self, action_name):
 		"""
@@ -45,18 +46,13 @@ class ActionRegistry:
 		"""
 		Get all actions available to a user based on their roles
 		"""
+		mask = self.get_action_mask(user_roles)
 		available = []
 		
-		for action_name, action in self.actions.items():
-			# Check if user has any of the required roles
-			if not action.get("allowed_roles"):
-				# If no roles specified, available to all
-				available.append(action)
-			else:
-				# Check if user has any required role
-				has_permission = any(role in user_roles for role in action["allowed_roles"])
-				if has_permission:
-					available.append(action)
+		while mask:
+			lowest = mask & -mask
+			available.append(self.actions[self.action_names[lowest.bit_length() - 1]])
+			mask ^= lowest
 		
 		return available
 	
@@ -64,15 +60,34 @@ class ActionRegistry:
 		"""
 		Check if an action is allowed for given user roles
 		"""
-		action = self.get_action(action_name)
-		
-		if not action:
+		bit = self.action_bits.get(action_name)
+		if not bit:
 			return False
 		
-		if not action.get("allowed_roles"):
-			return True
+		return bool(self.get_action_mask(user_roles) & bit)
+	
+	def get_handler_report(self):
+		"""
+		Get the handler validation report of the enabled actions
+		"""
+		return get_handler_report(self.actions, self.handler_errors)
+	
+	def get_action_mask(self, user_roles):
+		"""
+		Get the bitset of actions allowed for a role set: the OR of each
+		role's mask plus the actions without role restrictions
+		"""
+		key = frozenset(user_roles)
 		
-		return any(role in user_roles for role in action["allowed_roles"])
+		mask = self.role_set_masks.get(key)
+		if mask is None:
+			mask = self.unrestricted_mask
+			for role in key:
+				mask |= self.role_masks.get(role, 0)
+			
+			self.role_set_masks[key] = mask
+		
+		return mask
 	
 	@staticmethod
 	def register_default_actions():
@@ -80,305 +95,129 @@ class ActionRegistry:
 		Register default actions for common ERPNext operations
 		This should be called during installation/setup
 		"""
-		default_actions = [
-			# CRM Actions
-			{
-				"action_name": "view_leads_summary",
-				"action_category": "QUERY",
-				"module": "CRM",
-				"description": "View summary of leads",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.crm.get_leads_summary",
-				"allowed_roles": ["Sales User", "Sales Manager", "System Manager"]
-			},
-			{
-				"action_name": "view_opportunities",
-				"action_category": "QUERY",
-				"module": "CRM",
-				"description": "View opportunities",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.crm.get_opportunities",
-				"allowed_roles": ["Sales User", "Sales Manager", "System Manager"]
-			},
-			
-			# Selling Actions
-			{
-				"action_name": "view_sales_orders",
-				"action_category": "QUERY",
-				"module": "Selling",
-				"description": "View sales orders",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.selling.get_sales_orders",
-				"allowed_roles": ["Sales User", "Sales Manager", "System Manager"]
-			},
-			{
-				"action_name": "draft_sales_order",
-				"action_category": "DRAFT",
-				"module": "Selling",
-				"description": "Create a draft sales order",
-				"enabled": 1,
-				"requires_confirmation": 1,
-				"risk_level": "Medium",
-				"handler_function": "erpassist.erpassist.handlers.selling.create_sales_order_draft",
-				"allowed_roles": ["Sales User", "Sales Manager", "System Manager"]
-			},
-			
-			# Buying Actions
-			{
-				"action_name": "view_purchase_orders",
-				"action_category": "QUERY",
-				"module": "Buying",
-				"description": "View purchase orders",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.buying.get_purchase_orders",
-				"allowed_roles": ["Purchase User", "Purchase Manager", "System Manager"]
-			},
-			
-			# Stock Actions
-			{
-				"action_name": "view_stock_summary",
-				"action_category": "QUERY",
-				"module": "Stock",
-				"description": "View stock levels and summary",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.stock.get_stock_summary",
-				"allowed_roles": ["Stock User", "Stock Manager", "System Manager"]
-			},
-			
-			# Accounting Actions
-			{
-				"action_name": "view_account_balances",
-				"action_category": "QUERY",
-				"module": "Accounting",
-				"description": "View account balances",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.accounting.get_account_balances",
-				"allowed_roles": ["Accounts User", "Accounts Manager", "System Manager"]
-			},
-			{
-				"action_name": "draft_journal_entry",
-				"action_category": "DRAFT",
-				"module": "Accounting",
-				"description": "Create a draft journal entry",
-				"enabled": 1,
-				"requires_confirmation": 1,
-				"risk_level": "High",
-				"handler_function": "erpassist.erpassist.handlers.accounting.create_journal_entry_draft",
-				"allowed_roles": ["Accounts User", "Accounts Manager", "System Manager"]
-			},
-			
-			# HR Actions
-			{
-				"action_name": "view_employee_list",
-				"action_category": "QUERY",
-				"module": "HR",
-				"description": "View employee list",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.hr.get_employee_list",
-				"allowed_roles": ["HR User", "HR Manager", "System Manager"]
-			},
-			{
-				"action_name": "approve_leave_application",
-				"action_category": "APPROVE",
-				"module": "HR",
-				"description": "Approve a leave application",
-				"enabled": 1,
-				"requires_confirmation": 1,
-				"risk_level": "Medium",
-				"handler_function": "erpassist.erpassist.handlers.hr.approve_leave",
-				"allowed_roles": ["HR Manager", "System Manager"]
-			},
-			
-			# Payroll Actions
-			{
-				"action_name": "execute_payroll",
-				"action_category": "EXECUTE_PAYROLL",
-				"module": "Payroll",
-				"description": "Execute payroll for a period",
-				"enabled": 1,
-				"requires_confirmation": 1,
-				"risk_level": "Critical",
-				"handler_function": "erpassist.erpassist.handlers.payroll.execute_payroll",
-				"allowed_roles": ["HR Manager", "System Manager"]
-			},
-			
-			# Projects Actions
-			{
-				"action_name": "view_projects_summary",
-				"action_category": "QUERY",
-				"module": "Projects",
-				"description": "View projects summary",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.projects.get_projects_summary",
-				"allowed_roles": ["Projects User", "Projects Manager", "System Manager"]
-			},
-			{
-				"action_name": "view_tasks_summary",
-				"action_category": "QUERY",
-				"module": "Projects",
-				"description": "View tasks summary",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.projects.get_tasks_summary",
-				"allowed_roles": ["Projects User", "Projects Manager", "System Manager"]
-			},
-			
-			# Manufacturing Actions
-			{
-				"action_name": "view_work_orders",
-				"action_category": "QUERY",
-				"module": "Manufacturing",
-				"description": "View work orders",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.manufacturing.get_work_orders",
-				"allowed_roles": ["Manufacturing User", "Manufacturing Manager", "System Manager"]
-			},
-			{
-				"action_name": "view_bom_summary",
-				"action_category": "QUERY",
-				"module": "Manufacturing",
-				"description": "View Bill of Materials summary",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.manufacturing.get_bom_summary",
-				"allowed_roles": ["Manufacturing User", "Manufacturing Manager", "System Manager"]
-			},
-			
-			# Support Actions
-			{
-				"action_name": "view_issues_summary",
-				"action_category": "QUERY",
-				"module": "Support",
-				"description": "View support issues summary",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.support.get_issues_summary",
-				"allowed_roles": ["Support Team", "System Manager"]
-			},
-			{
-				"action_name": "view_service_level_summary",
-				"action_category": "QUERY",
-				"module": "Support",
-				"description": "View SLA compliance summary",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.support.get_service_level_summary",
-				"allowed_roles": ["Support Team", "System Manager"]
-			},
-			
-			# Assets Actions
-			{
-				"action_name": "view_assets_summary",
-				"action_category": "QUERY",
-				"module": "Assets",
-				"description": "View assets summary",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.assets.get_assets_summary",
-				"allowed_roles": ["Stock User", "Accounts User", "System Manager"]
-			},
-			{
-				"action_name": "view_asset_maintenance_schedule",
-				"action_category": "QUERY",
-				"module": "Assets",
-				"description": "View asset maintenance schedule",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.assets.get_asset_maintenance_schedule",
-				"allowed_roles": ["Stock User", "Accounts User", "System Manager"]
-			},
-			
-			# Quality Actions
-			{
-				"action_name": "view_quality_inspections",
-				"action_category": "QUERY",
-				"module": "Quality",
-				"description": "View quality inspections",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.quality.get_quality_inspections",
-				"allowed_roles": ["Quality Manager", "Stock User", "System Manager"]
-			},
-			{
-				"action_name": "view_quality_goals",
-				"action_category": "QUERY",
-				"module": "Quality",
-				"description": "View quality goals",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.quality.get_quality_goals",
-				"allowed_roles": ["Quality Manager", "System Manager"]
-			},
-			
-			# Maintenance Actions
-			{
-				"action_name": "view_maintenance_schedule",
-				"action_category": "QUERY",
-				"module": "Maintenance",
-				"description": "View maintenance schedule",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.maintenance.get_maintenance_schedule",
-				"allowed_roles": ["Sales User", "System Manager"]
-			},
-			{
-				"action_name": "view_maintenance_visits",
-				"action_category": "QUERY",
-				"module": "Maintenance",
-				"description": "View maintenance visits",
-				"enabled": 1,
-				"requires_confirmation": 0,
-				"risk_level": "Low",
-				"handler_function": "erpassist.erpassist.handlers.maintenance.get_maintenance_visits",
-				"allowed_roles": ["Sales User", "System Manager"]
-			},
-		]
+		from erpassist.erpassist.core.action_sync import sync_actions
 		
-		for action_data in default_actions:
-			# Extract roles
-			roles = action_data.pop("allowed_roles", [])
-			
-			# Check if action already exists
-			if frappe.db.exists("ERPAssist Action Registry", action_data["action_name"]):
-				continue
-			
-			# Create action
-			action_doc = frappe.get_doc({
-				"doctype": "ERPAssist Action Registry",
-				**action_data
-			})
-			
-			# Add roles
-			for role in roles:
-				action_doc.append("allowed_roles", {"role": role})
-			
-			action_doc.insert()
+		return sync_actions()
+
+def get_compiled_registry():
+	"""
+	Get the enabled actions (with roles and parsed parameter schemas) and
+	their role index. Cached per process and in Redis, keyed by site and
+	registry version
+	"""
+	site = frappe.local.site
+	version = get_registry_version()
+	
+	entry = _local_registry.get(site)
+	if entry and entry[0] == version:
+		return entry[1]
+	
+	cache_key = f"{REGISTRY_CACHE_KEY}:{version}"
+	registry = frappe.cache().get_value(cache_key)
+	
+	if registry is None:
+		registry = _compile(_load_actions())
+		frappe.cache().set_value(cache_key, registry, expires_in_sec=REGISTRY_CACHE_TTL)
+	
+	_local_registry[site] = (version, registry)
+	return registry
+
+def get_registry_version():
+	"""
+	Get the registry version shared by all workers of this site
+	"""
+	cache = frappe.cache()
+	version = cache.get_value(REGISTRY_VERSION_KEY)
+	
+	if not version:
+		version = frappe.generate_hash(length=12)
+		cache.set_value(REGISTRY_VERSION_KEY, version)
+	
+	return version
+
+def invalidate_registry(doc=None, method=None):
+	"""
+	Invalidate the compiled registry on all workers
+	Hooked to doc_events of ERPAssist Action Registry
+	"""
+	# Bump after commit so other workers never compile uncommitted data
+	frappe.db.after_commit.add(_bump_registry_version)
+
+def _bump_registry_version():
+	frappe.cache().set_value(REGISTRY_VERSION_KEY, frappe.generate_hash(length=12))
+	_local_registry.pop(frappe.local.site, None)
+
+def _load_actions():
+	"""
+	Load all enabled actions and their roles with a single joined query
+	"""
+	rows = frappe.db.sql("""
+		SELECT
+			registry.*,
+			role.role AS allowed_role
+		FROM `tabERPAssist Action Registry` registry
+		LEFT JOIN `tabERPAssist Action Role` role
+			ON role.parent = registry.name
+			AND role.parenttype = 'ERPAssist Action Registry'
+		WHERE registry.enabled = 1
+		ORDER BY registry.name, role.idx
+	""", as_dict=True)
+	
+	actions = {}
+	
+	for row in rows:
+		allowed_role = row.pop("allowed_role")
+		
+		action = actions.get(row.action_name)
+		if not action:
+			action = actions[row.action_name] = row
+			action["allowed_roles"] = []
+			action["parameter_schema"] = _parse_parameters(row.parameters)
 		
-		frappe.db.commit()
+		if allowed_role:
+			action["allowed_roles"].append(allowed_role)
+	
+	return actions
+
+def _compile(actions):
+	"""
+	Build the role -> action inverted index as integer bitsets and validate
+	the handler paths
+	"""
+	action_names = list(actions)
+	action_bits = {}
+	role_masks = {}
+	unrestricted_mask = 0
+	
+	for index, action_name in enumerate(action_names):
+		bit = 1 << index
+		action_bits[action_name] = bit
+		
+		roles = actions[action_name]["allowed_roles"]
+		if not roles:
+			# If no roles specified, available to all
+			unrestricted_mask |= bit
+		
+		for role in roles:
+			role_masks[role] = role_masks.get(role, 0) | bit
+	
+	return frappe._dict(
+		actions=actions,
+		action_names=action_names,
+		action_bits=action_bits,
+		role_masks=role_masks,
+		unrestricted_mask=unrestricted_mask,
+		handler_errors=validate_handlers(actions)
+	)
+
+def _parse_parameters(parameters):
+	"""
+	Parse a JSON parameter schema, falling back to an empty object schema
+	"""
+	if parameters:
+		try:
+			return json.loads(parameters)
+		except ValueError:
+			pass
+	
+	return {"type": "object", "properties": {}, "required": []}
@@ -0,0 +1,133 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import json
+import math
+import re
+from collections import Counter
+from erpassist.erpassist.core.actions_data import ACTIONS_DATA
+
+STOPWORDS = {
+	"a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "get", "give",
+	"how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "our", "please",
+	"show", "the", "this", "to", "us", "view", "we", "what", "which", "with", "you"
+}
+
+class ActionRetriever:
+	"""
+	Local BM25 index over registered actions
+	Used to send the model only the actions relevant to a message
+	"""
+	
+	def __init__(self, actions, k1=1.5, b=0.75):
+		self.k1 = k1
+		self.b = b
+		self.documents = {}
+		
+		extra_descriptions = _get_actions_data_descriptions()
+		
+		for action in actions:
+			name = action["action_name"]
+			text = " ".join([
+				name,
+				action.get("description") or "",
+				extra_descriptions.get(name, ""),
+				action.get("module") or "",
+				action.get("action_category") or "",
+				_describe_parameters(action.get("parameter_schema") or action.get("parameters"))
+			])
+			self.documents[name] = Counter(tokenize(text))
+		
+		lengths = [sum(terms.values()) for terms in self.documents.values()]
+		self.average_length = (sum(lengths) / len(lengths)) if lengths else 0
+		
+		document_frequency = Counter()
+		for terms in self.documents.values():
+			document_frequency.update(terms.keys())
+		
+		total = len(self.documents)
+		self.idf = {
+			term: math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+			for term, frequency in document_frequency.items()
+		}
+	
+	def score(self, query, action_name):
+		"""
+		BM25 score of an action for a query
+		"""
+		terms = self.documents.get(action_name)
+		if not terms:
+			return 0
+		
+		length = sum(terms.values())
+		score = 0
+		
+		for term in set(tokenize(query)):
+			frequency = terms.get(term)
+			if not frequency:
+				continue
+			
+			norm = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1))
+			score += self.idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+		
+		return score
+	
+	def top_actions(self, query, candidates, top_k):
+		"""
+		Pick the top_k most relevant of the candidate action names
+		Returns all candidates if nothing in the query matches
+		"""
+		scored = [(self.score(query, name), name) for name in candidates]
+		scored = [(score, name) for score, name in scored if score > 0]
+		
+		if not scored:
+			return list(candidates)
+		
+		scored.sort(key=lambda item: (-item[0], item[1]))
+		return [name for score, name in scored[:top_k]]
+
+def tokenize(text):
+	"""
+	Lowercase word tokens with stopwords removed and plurals folded
+	"""
+	tokens = []
+	
+	for token in re.split(r"[^a-z0-9]+", (text or "").lower()):
+		if not token or token in STOPWORDS:
+			continue
+		
+		if len(token) > 3 and token.endswith("ies"):
+			token = token[:-3] + "y"
+		elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+			token = token[:-1]
+		
+		tokens.append(token)
+	
+	return tokens
+
+def _describe_parameters(parameters):
+	"""
+	Flatten a JSON schema into its property names and descriptions
+	"""
+	if not parameters:
+		return ""
+	
+	try:
+		schema = json.loads(parameters) if isinstance(parameters, str) else parameters
+	except ValueError:
+		return ""
+	
+	parts = []
+	for name, definition in (schema.get("properties") or {}).items():
+		parts.append(name)
+		if isinstance(definition, dict):
+			parts.append(definition.get("description") or "")
+	
+	return " ".join(parts)
+
+def _get_actions_data_descriptions():
+	return {
+		action["action_name"]: action.get("description", "")
+		for actions in ACTIONS_DATA.values()
+		for action in actions
+	}
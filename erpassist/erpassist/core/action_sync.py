@@ -0,0 +1,165 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+from erpassist.erpassist.core.actions_data import ACTIONS_DATA
+
+REGISTRY_DOCTYPE = "ERPAssist Action Registry"
+ROLE_DOCTYPE = "ERPAssist Action Role"
+
+# Registry fields owned by ACTIONS_DATA; enabled, parameters and
+# disable_response_cache stay as configured on the site
+SYNCED_FIELDS = ["action_category", "module", "description", "requires_confirmation", "risk_level", "handler_function"]
+
+def sync_actions(actions_data=None, verbose=False):
+	"""
+	Bring ERPAssist Action Registry in line with ACTIONS_DATA
+	Only new and changed actions are written, with bulk inserts, in one
+	transaction. Actions that exist only on the site are left alone
+	Returns the number of inserted, updated and unchanged actions
+	"""
+	desired = _get_desired_actions(actions_data or ACTIONS_DATA)
+	current = _get_current_actions(list(desired))
+	
+	new = [name for name in desired if name not in current]
+	changed = [
+		name for name in desired
+		if name in current and _differs(desired[name], current[name])
+	]
+	
+	try:
+		if new:
+			_insert_actions([desired[name] for name in new])
+		
+		for name in changed:
+			frappe.db.set_value(
+				REGISTRY_DOCTYPE,
+				name,
+				{field: desired[name][field] for field in SYNCED_FIELDS}
+			)
+		
+		# Roles of new and changed actions are replaced as a whole
+		if changed:
+			frappe.db.delete(ROLE_DOCTYPE, {
+				"parenttype": REGISTRY_DOCTYPE,
+				"parent": ["in", changed]
+			})
+		
+		if new or changed:
+			_insert_roles([desired[name] for name in new + changed])
+			
+			# Bulk writes skip doc_events, so invalidate caches here
+			from erpassist.erpassist.core.action_registry import invalidate_registry
+			from erpassist.erpassist.core.orchestrator_pool import invalidate_pool
+			invalidate_registry()
+			invalidate_pool()
+		
+		frappe.db.commit()
+	
+	except Exception:
+		frappe.db.rollback()
+		raise
+	
+	stats = {
+		"inserted": len(new),
+		"updated": len(changed),
+		"unchanged": len(desired) - len(new) - len(changed)
+	}
+	
+	if verbose:
+		print(f"ERPAssist actions: {stats['inserted']} inserted, {stats['updated']} updated, {stats['unchanged']} unchanged")
+	
+	return stats
+
+def after_migrate():
+	"""
+	Sync actions after bench migrate
+	"""
+	sync_actions(verbose=True)
+
+def _get_desired_actions(actions_data):
+	desired = {}
+	
+	for module, actions in actions_data.items():
+		for action in actions:
+			desired[action["action_name"]] = frappe._dict(
+				action_name=action["action_name"],
+				action_category=action.get("category") or "QUERY",
+				module=module,
+				description=action.get("description"),
+				requires_confirmation=1 if action.get("confirmation") else 0,
+				risk_level=action.get("risk") or "Low",
+				handler_function=action["handler"],
+				roles=list(action.get("roles") or [])
+			)
+	
+	return desired
+
+def _get_current_actions(names):
+	"""
+	Load stored actions and their roles with two queries
+	"""
+	if not names:
+		return {}
+	
+	current = {
+		row.name: row
+		for row in frappe.get_all(
+			REGISTRY_DOCTYPE,
+			filters={"name": ["in", names]},
+			fields=["name"] + SYNCED_FIELDS
+		)
+	}
+	
+	for row in current.values():
+		row.roles = []
+	
+	roles = frappe.get_all(
+		ROLE_DOCTYPE,
+		filters={"parenttype": REGISTRY_DOCTYPE, "parent": ["in", list(current)]},
+		fields=["parent", "role"],
+		order_by="parent asc, idx asc"
+	) if current else []
+	
+	for row in roles:
+		current[row.parent].roles.append(row.role)
+	
+	return current
+
+def _differs(desired, current):
+	if any((desired[field] or None) != (current[field] or None) for field in SYNCED_FIELDS):
+		return True
+	
+	return desired.roles != current.roles
+
+def _insert_actions(actions):
+	now = frappe.utils.now()
+	user = frappe.session.user
+	
+	frappe.db.bulk_insert(
+		REGISTRY_DOCTYPE,
+		["name", "creation", "modified", "owner", "modified_by", "docstatus", "idx", "action_name", "enabled"] + SYNCED_FIELDS,
+		[
+			[action.action_name, now, now, user, user, 0, 0, action.action_name, 1] + [action[field] for field in SYNCED_FIELDS]
+			for action in actions
+		]
+	)
+
+def _insert_roles(actions):
+	now = frappe.utils.now()
+	user = frappe.session.user
+	values = []
+	
+	for action in actions:
+		for idx, role in enumerate(action.roles, start=1):
+			values.append([
+				frappe.generate_hash(length=10), now, now, user, user, 0, idx,
+				action.action_name, REGISTRY_DOCTYPE, "allowed_roles", role
+			])
+	
+	if values:
+		frappe.db.bulk_insert(
+			ROLE_DOCTYPE,
+			["name", "creation", "modified", "owner", "modified_by", "docstatus", "idx", "parent", "parenttype", "parentfield", "role"],
+			values
+		)
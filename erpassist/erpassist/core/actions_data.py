@@ -1,8 +1,8 @@
 # ERPAssist Action Definitions
 # This file contains all default actions to be installed
 
-# This would be imported by action_registry.py during installation
-# Format: List of action definitions
+# Synced into the registry on install, on migrate and with bench erpassist-sync-actions
+# Format: module -> list of action definitions
 
 ACTIONS_DATA = {
     "CRM": [
@@ -113,11 +113,194 @@ ACTIONS_DATA = {
             "risk": "Medium",
             "confirmation": True,
             "roles": ["Sales User", "Sales Manager", "System Manager"]
+        },
+        {
+            "action_name": "draft_sales_order",
+            "description": "Create a draft sales order",
+            "handler": "erpassist.erpassist.handlers.selling.create_sales_order_draft",
+            "category": "DRAFT",
+            "risk": "Medium",
+            "confirmation": True,
+            "roles": ["Sales User", "Sales Manager", "System Manager"]
+        }
+    ],
+    "Buying": [
+        {
+            "action_name": "view_purchase_orders",
+            "description": "View purchase orders",
+            "handler": "erpassist.erpassist.handlers.buying.get_purchase_orders",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Purchase User", "Purchase Manager", "System Manager"]
+        }
+    ],
+    "Stock": [
+        {
+            "action_name": "view_stock_summary",
+            "description": "View stock levels and summary",
+            "handler": "erpassist.erpassist.handlers.stock.get_stock_summary",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Stock User", "Stock Manager", "System Manager"]
+        }
+    ],
+    "Accounting": [
+        {
+            "action_name": "view_account_balances",
+            "description": "View account balances",
+            "handler": "erpassist.erpassist.handlers.accounting.get_account_balances",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Accounts User", "Accounts Manager", "System Manager"]
+        },
+        {
+            "action_name": "draft_journal_entry",
+            "description": "Create a draft journal entry",
+            "handler": "erpassist.erpassist.handlers.accounting.create_journal_entry_draft",
+            "category": "DRAFT",
+            "risk": "High",
+            "confirmation": True,
+            "roles": ["Accounts User", "Accounts Manager", "System Manager"]
+        }
+    ],
+    "HR": [
+        {
+            "action_name": "view_employee_list",
+            "description": "View employee list",
+            "handler": "erpassist.erpassist.handlers.hr.get_employee_list",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["HR User", "HR Manager", "System Manager"]
+        },
+        {
+            "action_name": "approve_leave_application",
+            "description": "Approve a leave application",
+            "handler": "erpassist.erpassist.handlers.hr.approve_leave",
+            "category": "APPROVE",
+            "risk": "Medium",
+            "confirmation": True,
+            "roles": ["HR Manager", "System Manager"]
+        }
+    ],
+    "Payroll": [
+        {
+            "action_name": "execute_payroll",
+            "description": "Execute payroll for a period",
+            "handler": "erpassist.erpassist.handlers.payroll.execute_payroll",
+            "category": "EXECUTE_PAYROLL",
+            "risk": "Critical",
+            "confirmation": True,
+            "roles": ["HR Manager", "System Manager"]
+        }
+    ],
+    "Projects": [
+        {
+            "action_name": "view_projects_summary",
+            "description": "View projects summary",
+            "handler": "erpassist.erpassist.handlers.projects.get_projects_summary",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Projects User", "Projects Manager", "System Manager"]
+        },
+        {
+            "action_name": "view_tasks_summary",
+            "description": "View tasks summary",
+            "handler": "erpassist.erpassist.handlers.projects.get_tasks_summary",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Projects User", "Projects Manager", "System Manager"]
+        }
+    ],
+    "Manufacturing": [
+        {
+            "action_name": "view_work_orders",
+            "description": "View work orders",
+            "handler": "erpassist.erpassist.handlers.manufacturing.get_work_orders",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Manufacturing User", "Manufacturing Manager", "System Manager"]
+        },
+        {
+            "action_name": "view_bom_summary",
+            "description": "View Bill of Materials summary",
+            "handler": "erpassist.erpassist.handlers.manufacturing.get_bom_summary",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Manufacturing User", "Manufacturing Manager", "System Manager"]
         }
     ],
-    # Add all other modules here...
-    # Total: 50+ actions across 12 modules
+    "Support": [
+        {
+            "action_name": "view_issues_summary",
+            "description": "View support issues summary",
+            "handler": "erpassist.erpassist.handlers.support.get_issues_summary",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Support Team", "System Manager"]
+        },
+        {
+            "action_name": "view_service_level_summary",
+            "description": "View SLA compliance summary",
+            "handler": "erpassist.erpassist.handlers.support.get_service_level_summary",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Support Team", "System Manager"]
+        }
+    ],
+    "Assets": [
+        {
+            "action_name": "view_assets_summary",
+            "description": "View assets summary",
+            "handler": "erpassist.erpassist.handlers.assets.get_assets_summary",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Stock User", "Accounts User", "System Manager"]
+        },
+        {
+            "action_name": "view_asset_maintenance_schedule",
+            "description": "View asset maintenance schedule",
+            "handler": "erpassist.erpassist.handlers.assets.get_asset_maintenance_schedule",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Stock User", "Accounts User", "System Manager"]
+        }
+    ],
+    "Quality": [
+        {
+            "action_name": "view_quality_inspections",
+            "description": "View quality inspections",
+            "handler": "erpassist.erpassist.handlers.quality.get_quality_inspections",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Quality Manager", "Stock User", "System Manager"]
+        },
+        {
+            "action_name": "view_quality_goals",
+            "description": "View quality goals",
+            "handler": "erpassist.erpassist.handlers.quality.get_quality_goals",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Quality Manager", "System Manager"]
+        }
+    ],
+    "Maintenance": [
+        {
+            "action_name": "view_maintenance_schedule",
+            "description": "View maintenance schedule",
+            "handler": "erpassist.erpassist.handlers.maintenance.get_maintenance_schedule",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Sales User", "System Manager"]
+        },
+        {
+            "action_name": "view_maintenance_visits",
+            "description": "View maintenance visits",
+            "handler": "erpassist.erpassist.handlers.maintenance.get_maintenance_visits",
+            "category": "QUERY",
+            "risk": "Low",
+            "roles": ["Sales User", "System Manager"]
+        }
+    ]
 }
 
-# Total action count: 50+
-# This is a reference file - actual installation handled by action_registry.py
+# Synced into ERPAssist Action Registry by erpassist.erpassist.core.action_sync
@@ -0,0 +1,201 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+import gzip
+import json
+import os
+import shutil
+from frappe.utils import add_days, add_months, cint, get_first_day, getdate, nowdate
+from erpassist.erpassist.core.audit_payload import get_blob_path
+
+ARCHIVE_CHUNK = 1000
+
+# Audit log rows are kept in the table for a year unless ERPAssist Settings says otherwise
+DEFAULT_RETENTION_DAYS = 365
+
+def archive_audit_log():
+	"""
+	Move audit log rows older than the retention horizon into one gzipped
+	NDJSON file per month, then delete them from the table
+	Whole months are archived, so each month is written once. The result
+	blobs of archived rows move to the archive as well
+	"""
+	retention_days = _get_retention_days()
+	
+	# 0 keeps the audit log in the table forever
+	if not retention_days:
+		return
+	
+	cutoff = get_first_day(add_days(nowdate(), -retention_days))
+	oldest = frappe.db.sql("""
+		SELECT MIN(timestamp)
+		FROM `tabERPAssist Audit Log`
+		WHERE timestamp < %s
+	""", cutoff)[0][0]
+	
+	if not oldest:
+		return
+	
+	month = get_first_day(oldest)
+	while month < cutoff:
+		_archive_month(month)
+		month = add_months(month, 1)
+
+def read_archive(from_date=None, to_date=None, filters=None):
+	"""
+	Stream archived audit log rows with a timestamp between from_date and
+	to_date (inclusive dates) whose fields equal the values in filters
+	Only the monthly files in the date range are opened
+	"""
+	filters = filters or {}
+	start = getdate(from_date) if from_date else None
+	end = getdate(to_date) if to_date else None
+	
+	for month, path in _get_archive_files():
+		if (start and get_first_day(start) > month) or (end and end < month):
+			continue
+		
+		for row in _read_file(path):
+			timestamp = getdate(row["timestamp"])
+			if (start and timestamp < start) or (end and timestamp > end):
+				continue
+			
+			if all(row.get(field) == value for field, value in filters.items()):
+				yield row
+
+def get_archive_path():
+	return frappe.get_site_path("private", "erpassist_audit_archive")
+
+def get_archived_blob_path(blob):
+	return os.path.join(get_archive_path(), "blobs", blob[:2], f"{blob}.json.gz")
+
+def _get_retention_days():
+	"""
+	get_single_value reads a missing Int as 0, which would turn archiving off
+	on sites that never saved the setting, so look for the stored value itself
+	"""
+	value = frappe.db.sql("""
+		SELECT value
+		FROM `tabSingles`
+		WHERE doctype = 'ERPAssist Settings' AND field = 'audit_retention_days'
+	""")
+	
+	return cint(value[0][0]) if value else DEFAULT_RETENTION_DAYS
+
+def _archive_month(month):
+	"""
+	Write the month's rows to its archive file and delete them
+	The file is replaced atomically; rows already in it (from a run that
+	died before deleting them) are not written twice
+	"""
+	next_month = add_months(month, 1)
+	path = os.path.join(get_archive_path(), f"audit-{month.strftime('%Y-%m')}.ndjson.gz")
+	tmp_path = path + ".tmp"
+	
+	os.makedirs(get_archive_path(), exist_ok=True)
+	
+	archived = set()
+	if os.path.exists(path):
+		archived = {row["name"] for row in _read_file(path)}
+		shutil.copyfile(path, tmp_path)
+	elif os.path.exists(tmp_path):
+		os.remove(tmp_path)
+	
+	names = []
+	blobs = set()
+	last_name = ""
+	
+	# Appending adds a gzip member; readers see one stream
+	with gzip.open(tmp_path, "at") as f:
+		while True:
+			rows = frappe.db.sql("""
+				SELECT *
+				FROM `tabERPAssist Audit Log`
+				WHERE timestamp >= %s AND timestamp < %s AND name > %s
+				ORDER BY name
+				LIMIT %s
+			""", (month, next_month, last_name, ARCHIVE_CHUNK), as_dict=True)
+			
+			if not rows:
+				break
+			
+			for row in rows:
+				if row.name not in archived:
+					f.write(json.dumps(row, default=str) + "\n")
+				names.append(row.name)
+				
+				if row.result_blob:
+					blobs.add(row.result_blob)
+			
+			last_name = rows[-1].name
+	
+	if not names:
+		os.remove(tmp_path)
+		return
+	
+	# Blobs are in the archive before any row that references them is deleted
+	for blob in blobs:
+		_archive_blob(blob)
+	
+	os.replace(tmp_path, path)
+	
+	for i in range(0, len(names), ARCHIVE_CHUNK):
+		frappe.db.delete("ERPAssist Audit Log", {"name": ["in", names[i:i + ARCHIVE_CHUNK]]})
+		frappe.db.commit()
+	
+	_remove_unreferenced_blobs(blobs)
+
+def _archive_blob(blob):
+	source = get_blob_path(blob)
+	target = get_archived_blob_path(blob)
+	
+	if os.path.exists(target) or not os.path.exists(source):
+		return
+	
+	os.makedirs(os.path.dirname(target), exist_ok=True)
+	shutil.copyfile(source, target + ".tmp")
+	os.replace(target + ".tmp", target)
+
+def _remove_unreferenced_blobs(blobs):
+	"""
+	Delete the blobs no row left in the table references
+	Identical results share a blob, so newer rows can still point to an
+	archived one; a row that gets one after the check reads the archived copy
+	"""
+	blobs = list(blobs)
+	
+	for i in range(0, len(blobs), ARCHIVE_CHUNK):
+		chunk = blobs[i:i + ARCHIVE_CHUNK]
+		referenced = set(frappe.get_all(
+			"ERPAssist Audit Log",
+			filters={"result_blob": ["in", chunk]},
+			pluck="result_blob",
+			distinct=True
+		))
+		
+		for blob in chunk:
+			if blob not in referenced and os.path.exists(get_blob_path(blob)):
+				os.remove(get_blob_path(blob))
+
+def _get_archive_files():
+	"""
+	Get (first day of month, path) of every archive file, oldest first
+	"""
+	path = get_archive_path()
+	if not os.path.isdir(path):
+		return []
+	
+	files = []
+	for filename in sorted(os.listdir(path)):
+		if filename.startswith("audit-") and filename.endswith(".ndjson.gz"):
+			month = getdate(filename[len("audit-"):-len(".ndjson.gz")] + "-01")
+			files.append((month, os.path.join(path, filename)))
+	
+	return files
+
+def _read_file(path):
+	with gzip.open(path, "rt") as f:
+		for line in f:
+			if line.strip():
+				yield json.loads(line)
@@ -2,39 +2,76 @@
 # For license information, please see license.txt
 
 import frappe
+import json
+import os
+import time
+from frappe.model.naming import set_new_name
+from erpassist.erpassist.core.audit_payload import AuditPayload
+
+BUFFER_KEY = "erpassist:audit:buffer"
+PROCESSING_KEY = "erpassist:audit:processing"
+FLUSH_LOCK_KEY = "erpassist:audit:flush_lock"
+
+# Batches that fail to insert are parked here for inspection
+DEAD_LETTER_KEY = "erpassist:audit:dead_letter"
+
+# A flush job is queued every FLUSH_SIZE buffered events; the scheduler
+# flushes whatever is left every minute
+FLUSH_SIZE = 200
+FLUSH_BATCH = 1000
+FLUSH_LOCK_TTL = 5 * 60
+
+# Spill files are only picked up once their writer is done with them
+SPILL_SETTLE_SECONDS = 5
+
+AUDIT_FIELDS = ["user", "action_name", "action_category", "status", "timestamp", "session_id", "query", "result", "result_size", "result_blob", "error_message"]
 
 class AuditLogger:
 	"""
 	Logs all actions performed by ERPAssist for audit trail
+	Entries are buffered in Redis and written in batches by flush_audit_log
 	"""
 	
 	@staticmethod
 	def log_action(user, action_name, action_category, status, query=None, result=None, error_message=None, session_id=None):
 		"""
-		Create an audit log entry
+		Queue an audit log entry
+		Falls back to a spill file in the site's private files if Redis is unavailable
 		"""
+		event = json.dumps({
+			"user": user,
+			"action_name": action_name,
+			"action_category": action_category,
+			"status": status,
+			"timestamp": frappe.utils.now(),
+			"session_id": session_id,
+			"query": query,
+			"result": result,
+			"error_message": error_message
+		}, default=str)
+		
 		try:
-			audit_log = frappe.get_doc({
-				"doctype": "ERPAssist Audit Log",
-				"user": user,
-				"action_name": action_name,
-				"action_category": action_category,
-				"status": status,
-				"timestamp": frappe.utils.now(),
-				"session_id": session_id,
-				"query": query,
-				"result": result,
-				"error_message": error_message
-			})
-			audit_log.insert(ignore_permissions=True)
-			frappe.db.commit()
-			
-			return audit_log.name
-			
-		except Exception as e:
-			frappe.log_error(frappe.get_traceback(), "Audit Logger Error")
-			# Don't fail the main operation if audit logging fails
-			return None
+			cache = frappe.cache()
+			
+			# New entries go to the head, flushes take the oldest from the tail
+			# The raw command, as RedisWrapper.lpush prefixes the key itself and
+			# returns nothing; every list command here takes make_key'd keys
+			length = cache.execute_command("LPUSH", cache.make_key(BUFFER_KEY), event)
+			
+			if length % FLUSH_SIZE == 0:
+				frappe.enqueue(
+					"erpassist.erpassist.core.audit_logger.flush_audit_log",
+					queue="short",
+					job_id="erpassist-audit-flush",
+					deduplicate=True
+				)
+		
+		except Exception:
+			try:
+				_spill(event)
+			except Exception:
+				# Don't fail the main operation if audit logging fails
+				frappe.log_error(frappe.get_traceback(), "Audit Logger Error")
 	
 	@staticmethod
 	def get_user_activity(user, limit=50):
@@ -61,3 +98,138 @@ class AuditLogger:
 			order_by="timestamp desc",
 			limit=limit
 		)
+
+def flush_audit_log():
+	"""
+	Write buffered and spilled audit entries with bulk inserts
+	Each batch is moved to a processing list before it is written and only
+	dropped after commit, so entries of a flush that dies are written by the next
+	A batch that fails to insert goes to the dead letter list instead of
+	blocking the ones behind it
+	"""
+	cache = frappe.cache()
+	lock_key = cache.make_key(FLUSH_LOCK_KEY)
+	token = frappe.generate_hash(length=12)
+	
+	if not cache.set(lock_key, token, nx=True, ex=FLUSH_LOCK_TTL):
+		return
+	
+	try:
+		_flush_spill_files()
+		
+		buffer_key = cache.make_key(BUFFER_KEY)
+		processing_key = cache.make_key(PROCESSING_KEY)
+		dead_letter_key = cache.make_key(DEAD_LETTER_KEY)
+		
+		while True:
+			events = cache.execute_command("LRANGE", processing_key, 0, -1)
+			
+			if not events:
+				# RPOPLPUSH rather than LMOVE, which needs Redis 6.2
+				pipe = cache.pipeline()
+				for _ in range(FLUSH_BATCH):
+					pipe.rpoplpush(buffer_key, processing_key)
+				events = [event for event in pipe.execute() if event]
+			
+			if not events:
+				break
+			
+			try:
+				_insert_events([json.loads(event) for event in events])
+				frappe.db.commit()
+			except Exception:
+				frappe.db.rollback()
+				frappe.log_error(frappe.get_traceback(), "Audit Log Flush Error")
+				
+				pipe = cache.pipeline()
+				for _ in events:
+					pipe.rpoplpush(processing_key, dead_letter_key)
+				pipe.execute()
+				continue
+			
+			cache.delete(processing_key)
+	
+	finally:
+		if cache.get(lock_key) == token.encode():
+			cache.delete(lock_key)
+
+def _insert_events(events):
+	"""
+	Bulk insert audit entries, named by the doctype's naming rule
+	Results over their category's size cap are replaced by a digest
+	"""
+	payload = AuditPayload(frappe.get_cached_doc("ERPAssist Settings"))
+	values = []
+	
+	for event in events:
+		event["result"], event["result_size"], event["result_blob"] = payload.compact(
+			event.get("action_category"),
+			event.get("result")
+		)
+		
+		doc = frappe.new_doc("ERPAssist Audit Log")
+		doc.update(event)
+		set_new_name(doc)
+		
+		values.append(
+			[doc.name, event["timestamp"], event["timestamp"], event["user"], event["user"], 0, 0]
+			+ [event.get(field) for field in AUDIT_FIELDS]
+		)
+	
+	frappe.db.bulk_insert(
+		"ERPAssist Audit Log",
+		["name", "creation", "modified", "owner", "modified_by", "docstatus", "idx"] + AUDIT_FIELDS,
+		values
+	)
+
+def _get_spill_path():
+	return frappe.get_site_path("private", "erpassist_audit")
+
+def _spill(event):
+	"""
+	Append an entry to this process's spill file, synced to disk
+	"""
+	path = _get_spill_path()
+	os.makedirs(path, exist_ok=True)
+	
+	with open(os.path.join(path, f"spill-{os.getpid()}.jsonl"), "a") as f:
+		f.write(event + "\n")
+		f.flush()
+		os.fsync(f.fileno())
+
+def _flush_spill_files():
+	path = _get_spill_path()
+	if not os.path.isdir(path):
+		return
+	
+	for filename in sorted(os.listdir(path)):
+		file_path = os.path.join(path, filename)
+		
+		# Claim settled spill files by renaming them; claimed files left by a
+		# failed flush are picked up again
+		if filename.endswith(".jsonl"):
+			if time.time() - os.path.getmtime(file_path) < SPILL_SETTLE_SECONDS:
+				continue
+			
+			claimed_path = file_path + ".flushing"
+			os.replace(file_path, claimed_path)
+		elif filename.endswith(".flushing"):
+			claimed_path = file_path
+		else:
+			continue
+		
+		try:
+			with open(claimed_path) as f:
+				events = [json.loads(line) for line in f if line.strip()]
+			
+			if events:
+				_insert_events(events)
+				frappe.db.commit()
+		except Exception:
+			# Set the file aside like a dead letter batch
+			frappe.db.rollback()
+			frappe.log_error(frappe.get_traceback(), "Audit Log Flush Error")
+			os.replace(claimed_path, claimed_path[:-len(".flushing")] + ".failed")
+			continue
+		
+		os.remove(claimed_path)
@@ -0,0 +1,118 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+import gzip
+import hashlib
+import json
+import os
+
+# Results larger than this are stored as a digest unless ERPAssist Settings
+# has a cap for the action category
+DEFAULT_RESULT_CAP = 4096
+
+# Rows of each list kept in a digest
+PREVIEW_ROWS = 5
+
+class AuditPayload:
+	"""
+	Keeps audit log rows small: results over their category's size cap are
+	stored inline as a digest, the full result goes gzipped to a blob file
+	in the site's private files named by its sha256
+	"""
+	
+	def __init__(self, settings):
+		self.default_cap = settings.audit_result_cap or DEFAULT_RESULT_CAP
+		self.category_caps = _parse_caps(settings.audit_result_category_caps)
+	
+	def compact(self, action_category, result):
+		"""
+		Get (result to store inline, result size, blob name or None)
+		"""
+		if not result:
+			return result, 0, None
+		
+		size = len(result.encode())
+		if size <= self.category_caps.get(action_category, self.default_cap):
+			return result, size, None
+		
+		blob = hashlib.sha256(result.encode()).hexdigest()
+		path = get_blob_path(blob)
+		
+		# Identical results share a blob
+		if not os.path.exists(path):
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+			
+			tmp_path = path + ".tmp"
+			with gzip.open(tmp_path, "wb") as f:
+				f.write(result.encode())
+			os.replace(tmp_path, path)
+		
+		return json.dumps(_digest(result, size, blob), default=str), size, blob
+
+def get_blob_path(blob):
+	return frappe.get_site_path("private", "erpassist_audit_blobs", blob[:2], f"{blob}.json.gz")
+
+def read_blob(blob):
+	"""
+	Get the full result stored in a blob, also once it has been archived
+	"""
+	from erpassist.erpassist.core.audit_archive import get_archived_blob_path
+	
+	path = get_blob_path(blob)
+	if not os.path.exists(path):
+		path = get_archived_blob_path(blob)
+	
+	with gzip.open(path, "rb") as f:
+		return f.read().decode()
+
+def _digest(result, size, blob):
+	data = json.loads(result)
+	
+	digest = {
+		"digest": True,
+		"size": size,
+		"sha256": blob,
+		"rows": _count_rows(data),
+		"preview": _preview(data)
+	}
+	
+	# A wide first few rows can still be large, keep the keys only
+	if len(json.dumps(digest, default=str)) > DEFAULT_RESULT_CAP:
+		digest["preview"] = list(data) if isinstance(data, dict) else None
+	
+	return digest
+
+def _count_rows(data):
+	if isinstance(data, list):
+		return len(data)
+	
+	if isinstance(data, dict):
+		return {key: len(value) for key, value in data.items() if isinstance(value, list)} or None
+	
+	return None
+
+def _preview(data):
+	if isinstance(data, list):
+		return data[:PREVIEW_ROWS]
+	
+	if isinstance(data, dict):
+		return {
+			key: value[:PREVIEW_ROWS] if isinstance(value, list) else value
+			for key, value in data.items()
+		}
+	
+	return data
+
+def _parse_caps(value):
+	"""
+	Parse {"ACTION_CATEGORY": max bytes} from ERPAssist Settings
+	"""
+	if not value:
+		return {}
+	
+	try:
+		return {category: int(cap) for category, cap in json.loads(value).items()}
+	except (ValueError, TypeError, AttributeError):
+		frappe.log_error(frappe.get_traceback(), "ERPAssist Audit Result Caps Error")
+		return {}
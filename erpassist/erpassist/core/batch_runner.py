@@ -0,0 +1,236 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+import json
+from erpassist.erpassist.core.orchestrator_pool import get_orchestrator
+from erpassist.erpassist.core.orchestrator import tool_result_content
+from erpassist.erpassist.core.llm_batch import get_batch_backend
+from erpassist.erpassist.core.response_cache import fingerprint
+from erpassist.erpassist.core.single_flight import get_permission_scope
+
+def run_scheduled_prompts():
+	"""
+	Submit the enabled Scheduled Prompts from ERPAssist Settings as one batch run
+	"""
+	settings = frappe.get_single("ERPAssist Settings")
+	prompts = [
+		{"user": row.user, "message": row.prompt}
+		for row in settings.scheduled_prompts
+		if row.enabled
+	]
+	
+	if prompts:
+		start_batch_run(prompts)
+
+def start_batch_run(prompts):
+	"""
+	Submit prompts ([{"user", "message"}]) to the batch backend
+	Each prompt gets a new chat session that receives its answer
+	Returns the ERPAssist Batch Run name
+	"""
+	orchestrator = get_orchestrator()
+	items = []
+	
+	for index, prompt in enumerate(prompts):
+		items.append({
+			"custom_id": str(index),
+			"user": prompt["user"],
+			"message": prompt["message"],
+			"session_id": _create_session(prompt["user"], prompt["message"]),
+			"request": orchestrator.build_batch_request(prompt["message"], prompt["user"]),
+			"calls": [],
+			"results": [],
+			"done": False
+		})
+	
+	run = frappe.get_doc({
+		"doctype": "ERPAssist Batch Run",
+		"status": "Submitted",
+		"prompt_count": len(items),
+		"submitted_at": frappe.utils.now()
+	})
+	run.insert(ignore_permissions=True)
+	
+	_submit_round(run, items, orchestrator)
+	
+	return run.name
+
+def poll_batch_runs():
+	"""
+	Advance submitted batch runs whose current round has finished
+	"""
+	for name in frappe.get_all("ERPAssist Batch Run", filters={"status": "Submitted"}, pluck="name"):
+		run = frappe.get_doc("ERPAssist Batch Run", name)
+		
+		try:
+			_advance(run, get_orchestrator())
+		except Exception:
+			frappe.db.rollback()
+			frappe.log_error(frappe.get_traceback(), f"ERPAssist Batch Run Error: {name}")
+			frappe.db.set_value("ERPAssist Batch Run", name, {
+				"status": "Failed",
+				"error": frappe.get_traceback()
+			})
+			frappe.db.commit()
+
+def _advance(run, orchestrator):
+	"""
+	Process a finished round: answers are written to their sessions, tool
+	calls are executed (once per identical action, arguments and user across
+	the batch) and their results submitted as the next round
+	"""
+	results = _get_backend(orchestrator).get_results(run.batch_id)
+	if results is None:
+		return
+	
+	items = json.loads(run.state)
+	shared_results = {}
+	
+	# The last round gets no tools, so the model has to answer
+	final_round = run.round + 1 >= (orchestrator.settings.max_agent_steps or 5)
+	
+	for item in items:
+		if item["done"]:
+			continue
+		
+		outcome = results.get(item["custom_id"]) or {"error": "No result returned"}
+		if outcome.get("error"):
+			_finish(item, f"I encountered an error while processing your request: {outcome['error']}")
+			continue
+		
+		message = outcome["response"]["choices"][0]["message"]
+		tool_calls = message.get("tool_calls")
+		
+		if not tool_calls:
+			_finish(item, message.get("content") or "")
+			continue
+		
+		offered = {tool["function"]["name"] for tool in item["request"].get("tools") or []}
+		tool_messages = []
+		
+		for tool_call in tool_calls:
+			name = tool_call["function"]["name"]
+			try:
+				arguments = json.loads(tool_call["function"]["arguments"] or "{}")
+			except:
+				arguments = {}
+			
+			result = _execute_call(orchestrator, shared_results, item, name, arguments, offered)
+			
+			item["calls"].append(name)
+			item["results"].append(result)
+			tool_messages.append({
+				"role": "tool",
+				"tool_call_id": tool_call["id"],
+				"content": tool_result_content(result)
+			})
+		
+		item["request"]["messages"].append({
+			"role": "assistant",
+			"content": message.get("content"),
+			"tool_calls": tool_calls
+		})
+		item["request"]["messages"].extend(tool_messages)
+		
+		if final_round:
+			item["request"].pop("tools", None)
+			item["request"].pop("tool_choice", None)
+	
+	if any(not item["done"] for item in items):
+		_submit_round(run, items, orchestrator)
+		return
+	
+	run.state = json.dumps(items)
+	run.status = "Completed"
+	run.completed_at = frappe.utils.now()
+	run.save(ignore_permissions=True)
+	frappe.db.commit()
+
+def _execute_call(orchestrator, shared_results, item, name, arguments, offered):
+	"""
+	Run a QUERY action as the prompt's user, reusing the result of an
+	identical call made in this round by a user with the same permission
+	scope, see get_permission_scope
+	"""
+	action = orchestrator.action_registry.get_action(name)
+	
+	if name not in offered or not action:
+		return {"success": False, "message": "Action not found", "error": "Action not found"}
+	
+	# Batch runs cannot ask for confirmation
+	if action.get("action_category") != "QUERY":
+		return {
+			"success": False,
+			"message": "This action needs confirmation, please ask for it in the chat",
+			"error": "Confirmation required"
+		}
+	
+	key = (get_permission_scope(item["user"]), name, fingerprint(arguments))
+	if key in shared_results:
+		# The reused result is audited for this prompt's session as well
+		orchestrator.log_action(item["user"], action, arguments, shared_results[key], item["session_id"])
+		return shared_results[key]
+	
+	# Handlers read with the session user's permissions
+	current_user = frappe.session.user
+	frappe.set_user(item["user"])
+	try:
+		result = orchestrator.execute_action(name, arguments, item["user"], item["session_id"])
+	finally:
+		frappe.set_user(current_user)
+	
+	shared_results[key] = result
+	return result
+
+def _submit_round(run, items, orchestrator):
+	pending = [item for item in items if not item["done"]]
+	
+	run.batch_id = _get_backend(orchestrator).submit([
+		{"custom_id": item["custom_id"], "body": item["request"]}
+		for item in pending
+	])
+	run.round = (run.round or 0) + 1
+	run.state = json.dumps(items)
+	run.save(ignore_permissions=True)
+	frappe.db.commit()
+
+def _get_backend(orchestrator):
+	return get_batch_backend(
+		orchestrator.settings,
+		orchestrator.settings.get_password("openai_api_key", raise_exception=False),
+		orchestrator.client
+	)
+
+def _create_session(user, message):
+	session = frappe.get_doc({
+		"doctype": "ERPAssist Chat Session",
+		"user": user,
+		"session_title": message[:50] + "..." if len(message) > 50 else message,
+		"status": "Active"
+	})
+	session.append("messages", {
+		"role": "user",
+		"message": message,
+		"timestamp": frappe.utils.now()
+	})
+	session.insert(ignore_permissions=True)
+	
+	return session.name
+
+def _finish(item, answer):
+	"""
+	Write the answer for a batch item to its session
+	"""
+	item["done"] = True
+	item["answer"] = answer
+	
+	session = frappe.get_doc("ERPAssist Chat Session", item["session_id"])
+	session.append("messages", {
+		"role": "assistant",
+		"message": answer,
+		"timestamp": frappe.utils.now(),
+		"action_taken": (", ".join(item["calls"]) or "")[:140] or None,
+		"action_result": json.dumps(item["results"] or None)
+	})
+	session.save(ignore_permissions=True)
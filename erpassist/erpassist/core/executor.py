@@ -2,16 +2,30 @@
 # For license information, please see license.txt
 
 import frappe
+import ast
 import importlib
+import importlib.util
+import inspect
+import sys
 
 class ActionExecutor:
 	"""
 	Executes registered actions by calling their handler functions
+	Handlers are resolved through a dispatch table; each handler module is
+	imported on the first call to one of its handlers
 	"""
 	
-	def execute(self, action, parameters, user):
+	def __init__(self, action_registry=None):
+		# Broken handler paths found when the registry was compiled
+		self.handler_errors = action_registry.handler_errors if action_registry else {}
+		
+		# handler path -> (callable, whether it takes the permission context)
+		self.dispatch = {}
+	
+	def execute(self, action, parameters, user, permissions=None):
 		"""
 		Execute an action with given parameters
+		Handlers that accept a permissions argument get the turn's PermissionContext
 		"""
 		try:
 			# Get handler function
@@ -24,34 +38,37 @@ class ActionExecutor:
 					"error": "Missing handler function"
 				}
 			
-			# Parse handler function path
-			# Format: module.path.function_name
-			parts = handler_function.rsplit(".", 1)
-			if len(parts) != 2:
+			error = self.handler_errors.get(action.get("action_name"))
+			if error:
 				return {
 					"success": False,
-					"message": "Invalid handler function format",
-					"error": "Invalid handler format"
+					"message": f"Handler function not found: {handler_function}",
+					"error": error
 				}
 			
-			module_path, function_name = parts
+			entry = self.dispatch.get(handler_function)
+			if not entry:
+				try:
+					handler = _import_handler(handler_function)
+				except (ValueError, ImportError, AttributeError) as e:
+					return {
+						"success": False,
+						"message": f"Handler function not found: {handler_function}",
+						"error": str(e)
+					}
+				
+				entry = self.dispatch[handler_function] = (handler, "permissions" in inspect.signature(handler).parameters)
 			
-			# Import module and get function
-			try:
-				module = importlib.import_module(module_path)
-				handler = getattr(module, function_name)
-			except (ImportError, AttributeError) as e:
-				return {
-					"success": False,
-					"message": f"Handler function not found: {handler_function}",
-					"error": str(e)
-				}
+			handler, takes_permissions = entry
 			
 			# Execute handler
-			result = handler(parameters, user)
+			if takes_permissions:
+				result = handler(parameters, user, permissions=permissions)
+			else:
+				result = handler(parameters, user)
 			
 			return result
-			
+		
 		except Exception as e:
 			frappe.log_error(frappe.get_traceback(), f"Action Executor Error: {action.get('action_name')}")
 			return {
@@ -59,3 +76,86 @@ class ActionExecutor:
 				"message": f"Error executing action: {str(e)}",
 				"error": str(e)
 			}
+
+def validate_handlers(actions):
+	"""
+	Check every action's handler path without importing handler modules
+	Returns {action_name: error} for the broken ones
+	"""
+	errors = {}
+	module_names = {}
+	
+	for action_name, action in actions.items():
+		handler_function = action.get("handler_function")
+		if not handler_function:
+			errors[action_name] = "Missing handler function"
+			continue
+		
+		try:
+			module_path, function_name = _split_handler(handler_function)
+			
+			if module_path not in module_names:
+				module_names[module_path] = _get_module_names(module_path)
+			
+			if function_name not in module_names[module_path]:
+				errors[action_name] = f"{function_name} is not defined in {module_path}"
+		
+		except (ValueError, ImportError, SyntaxError) as e:
+			errors[action_name] = str(e)
+	
+	if errors:
+		frappe.logger("erpassist").warning({"broken_handlers": errors})
+	
+	return errors
+
+def get_handler_report(actions, handler_errors):
+	"""
+	List every action's handler path and whether it resolves
+	"""
+	return [
+		{
+			"action_name": action_name,
+			"handler_function": action.get("handler_function"),
+			"valid": action_name not in handler_errors,
+			"error": handler_errors.get(action_name)
+		}
+		for action_name, action in actions.items()
+	]
+
+def _split_handler(handler_function):
+	# Format: module.path.function_name
+	parts = handler_function.rsplit(".", 1)
+	if len(parts) != 2:
+		raise ValueError(f"Invalid handler function format: {handler_function}")
+	
+	return parts
+
+def _import_handler(handler_function):
+	module_path, function_name = _split_handler(handler_function)
+	return getattr(importlib.import_module(module_path), function_name)
+
+def _get_module_names(module_path):
+	"""
+	Get the top-level names of a module, from its source if it is not imported yet
+	"""
+	module = sys.modules.get(module_path)
+	if module:
+		return set(vars(module))
+	
+	spec = importlib.util.find_spec(module_path)
+	if not spec or not spec.origin or not spec.origin.endswith(".py"):
+		raise ImportError(f"Module not found: {module_path}")
+	
+	with open(spec.origin) as f:
+		tree = ast.parse(f.read(), spec.origin)
+	
+	names = set()
+	for node in tree.body:
+		if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+			names.add(node.name)
+		elif isinstance(node, ast.Assign):
+			names.update(target.id for target in node.targets if isinstance(target, ast.Name))
+		elif isinstance(node, (ast.Import, ast.ImportFrom)):
+			names.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+	
+	return names
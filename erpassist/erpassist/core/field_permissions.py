@@ -0,0 +1,86 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+import hashlib
+from frappe.model import default_fields, no_value_fields
+from erpassist.erpassist.core.permission_context import get_permission_context
+from erpassist.erpassist.core.permission_query import get_match_version
+
+FIELD_MAP_CACHE_KEY = "erpassist:field_permissions:map"
+
+# Field maps change only with DocType and Custom DocPerm edits, which bump
+# the permission rules version, so they can live for a day
+FIELD_MAP_CACHE_TTL = 24 * 60 * 60
+
+def get_field_map(doctype, user_roles):
+	"""
+	Get the readable fields of a doctype for a role set:
+	{"levels": readable permlevels, "fields": {permlevel: [fieldnames]}, "readable": [fieldnames]}
+	Cached in Redis per doctype and role set
+	"""
+	roles = sorted(set(user_roles))
+	role_key = hashlib.sha1("\n".join(roles).encode()).hexdigest()[:16]
+	cache_key = f"{FIELD_MAP_CACHE_KEY}:{get_match_version()}:{doctype}:{role_key}"
+	
+	field_map = frappe.cache().get_value(cache_key)
+	if field_map is None:
+		field_map = _build_field_map(doctype, roles)
+		frappe.cache().set_value(cache_key, field_map, expires_in_sec=FIELD_MAP_CACHE_TTL)
+	
+	return field_map
+
+def get_readable_fields(doctype, user, permissions=None):
+	"""
+	Get the set of fieldnames of a doctype the user may read
+	"""
+	permissions = get_permission_context(user, permissions)
+	
+	readable = permissions.readable_fields.get(doctype)
+	if readable is None:
+		readable = permissions.readable_fields[doctype] = set(get_field_map(doctype, permissions.roles)["readable"])
+	
+	return readable
+
+def project_readable_fields(doctype, fields, user, permissions=None):
+	"""
+	Drop the plain fieldnames the user may not read from a field list
+	SQL expressions and aliased fields are written by handlers, not
+	requested by the model, and are kept as they are
+	"""
+	readable = get_readable_fields(doctype, user, permissions)
+	
+	return [
+		field for field in fields
+		if not _is_fieldname(field) or field in readable
+	]
+
+def _build_field_map(doctype, roles):
+	meta = frappe.get_meta(doctype)
+	
+	# Child tables are read through their parent's permissions
+	if meta.istable or "Administrator" in roles:
+		levels = None
+	else:
+		levels = sorted({
+			perm.permlevel or 0
+			for perm in meta.permissions
+			if perm.role in roles and perm.read
+		})
+	
+	fields = {0: list(default_fields)}
+	for df in meta.fields:
+		if df.fieldname and df.fieldtype not in no_value_fields:
+			fields.setdefault(df.permlevel or 0, []).append(df.fieldname)
+	
+	if levels is None:
+		levels = sorted(fields)
+	
+	return {
+		"levels": levels,
+		"fields": fields,
+		"readable": [fieldname for level in levels for fieldname in fields.get(level, [])]
+	}
+
+def _is_fieldname(field):
+	return field.replace("_", "").isalnum()
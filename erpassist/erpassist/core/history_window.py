@@ -0,0 +1,206 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+
+try:
+	import tiktoken
+except ImportError:
+	tiktoken = None
+
+# Rows fetched per query while filling the window, newest first
+PAGE_SIZE = 50
+
+# Messages that must fall out of the window before the summary is refreshed
+SUMMARY_BATCH = 6
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and ERPAssist, an ERPNext assistant.
+Update the summary with the new messages. Keep names, document IDs, figures, dates and any open requests.
+Drop small talk. Reply with the updated summary only, at most 200 words."""
+
+class HistoryWindow:
+	"""
+	Token-budgeted conversation history
+	Fits the newest messages into the budget and represents older
+	messages by a rolling summary stored on the chat session
+	"""
+	
+	def __init__(self, token_budget, model):
+		self.token_budget = token_budget
+		self.encoding = _get_encoding(model)
+	
+	def count_tokens(self, text):
+		"""
+		Count tokens with tiktoken, or estimate at four characters per token
+		"""
+		if not text:
+			return 0
+		
+		if self.encoding:
+			return len(self.encoding.encode(text))
+		
+		return len(text) // 4 + 1
+	
+	def build(self, session_id, current_message=None):
+		"""
+		Get the model messages for a session's history
+		Returns (messages, pending) where pending is the number of messages
+		outside the window that are not yet in the summary
+		"""
+		session = frappe.db.get_value(
+			"ERPAssist Chat Session",
+			session_id,
+			["history_summary", "summarized_until"],
+			as_dict=True
+		)
+		if not session:
+			return [], 0
+		
+		summarized_until = session.summarized_until or 0
+		budget = self.token_budget - self.count_tokens(session.history_summary)
+		
+		window = []
+		oldest_idx = None
+		skip_current = bool(current_message)
+		start = 0
+		
+		while budget > 0:
+			rows = _get_messages(session_id, start=start)
+			if not rows:
+				break
+			
+			for row in rows:
+				# send_message saves the user message before it is processed
+				if skip_current:
+					skip_current = False
+					if row.role == "user" and row.message == current_message:
+						continue
+				
+				if row.idx <= summarized_until:
+					budget = 0
+					break
+				
+				tokens = self.count_tokens(row.message)
+				if tokens > budget:
+					# A single oversized message is cut to what still fits
+					if not window:
+						window.append({"role": row.role, "content": self._truncate(row.message, budget)})
+						oldest_idx = row.idx
+					budget = 0
+					break
+				
+				window.append({"role": row.role, "content": row.message})
+				oldest_idx = row.idx
+				budget -= tokens
+			
+			start += PAGE_SIZE
+		
+		window.reverse()
+		
+		if session.history_summary:
+			window.insert(0, {
+				"role": "system",
+				"content": f"Summary of the earlier conversation:\n{session.history_summary}"
+			})
+		
+		pending = 0
+		if oldest_idx:
+			pending = max(oldest_idx - 1 - summarized_until, 0)
+		
+		return window, pending
+	
+	def _truncate(self, text, tokens):
+		if self.encoding:
+			return self.encoding.decode(self.encoding.encode(text)[:tokens]) + " ... [truncated]"
+		
+		return text[:tokens * 4] + " ... [truncated]"
+
+def enqueue_summary_update(session_id):
+	"""
+	Refresh a session's rolling summary in the background
+	"""
+	frappe.enqueue(
+		"erpassist.erpassist.core.history_window.update_summary",
+		queue="short",
+		job_id=f"erpassist-summary-{session_id}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		session_id=session_id
+	)
+
+def update_summary(session_id):
+	"""
+	Fold messages that left the history window into the session summary
+	Only messages after summarized_until are sent, so each refresh is incremental
+	"""
+	from erpassist.erpassist.core.orchestrator_pool import get_orchestrator
+	
+	orchestrator = get_orchestrator()
+	window = orchestrator.history_window
+	
+	_, pending = window.build(session_id)
+	if pending < SUMMARY_BATCH:
+		return
+	
+	session = frappe.db.get_value(
+		"ERPAssist Chat Session",
+		session_id,
+		["history_summary", "summarized_until"],
+		as_dict=True
+	)
+	summarized_until = session.summarized_until or 0
+	
+	rows = frappe.get_all(
+		"ERPAssist Chat Message",
+		filters={
+			"parent": session_id,
+			"parenttype": "ERPAssist Chat Session",
+			"idx": ["between", [summarized_until + 1, summarized_until + pending]]
+		},
+		fields=["role", "message", "idx"],
+		order_by="idx asc"
+	)
+	if not rows:
+		return
+	
+	transcript = "\n".join(f"{row.role}: {row.message}" for row in rows)
+	
+	response = orchestrator.client.chat.completions.create(
+		model=orchestrator.model,
+		messages=[
+			{"role": "system", "content": SUMMARY_PROMPT},
+			{"role": "user", "content": f"Current summary:\n{session.history_summary or '(none)'}\n\nNew messages:\n{transcript}"}
+		],
+		max_tokens=400,
+		temperature=0
+	)
+	
+	frappe.db.set_value(
+		"ERPAssist Chat Session",
+		session_id,
+		{
+			"history_summary": response.choices[0].message.content,
+			"summarized_until": rows[-1].idx
+		},
+		update_modified=False
+	)
+	frappe.db.commit()
+
+def _get_messages(session_id, start=0):
+	return frappe.get_all(
+		"ERPAssist Chat Message",
+		filters={"parent": session_id, "parenttype": "ERPAssist Chat Session"},
+		fields=["role", "message", "idx"],
+		order_by="idx desc",
+		start=start,
+		limit=PAGE_SIZE
+	)
+
+def _get_encoding(model):
+	if not tiktoken:
+		return None
+	
+	try:
+		return tiktoken.encoding_for_model(model)
+	except KeyError:
+		return tiktoken.get_encoding("cl100k_base")
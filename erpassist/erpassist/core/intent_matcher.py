@@ -0,0 +1,220 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+import re
+from frappe.utils import add_days, add_months, get_first_day, get_first_day_of_week, get_last_day, nowdate
+
+STATS_KEY = "erpassist:intent:stats"
+
+# Optional lead-in before the thing asked for, e.g. "show me all the"
+VERB = r"(?:(?:please\s+)?(?:show|list|view|get|find|display|what are|give me)\s+(?:me\s+)?(?:all\s+)?(?:the\s+)?)?"
+
+PERIOD = r"(?P<period>today|yesterday|this week|last week|this month|last month)"
+
+# Each intent maps a whole message (case insensitive) to an action and arguments
+# Named groups become arguments: status, period (from_date/to_date), mine
+# (the user, as mine_parameter) and link groups resolved to document names
+INTENTS = [
+	{
+		"name": "issues",
+		"pattern": VERB + r"(?P<mine>my\s+)?(?:(?P<status>open|replied|on hold|resolved|closed)\s+)?(?:support\s+)?(?:issues|tickets)",
+		"action": "view_issues_summary",
+		"mine_parameter": "assigned_to",
+		"answer": "{message}."
+	},
+	{
+		"name": "stock_of_item",
+		"pattern": r"(?:(?:what is|what's|show|check|get)\s+(?:the\s+)?)?(?:stock|stock level|stock balance|qty|quantity)\s+(?:of|for)\s+(?:item\s+)?(?P<item_code>.+?)(?:\s+(?:in|at)\s+(?:warehouse\s+)?(?P<warehouse>.+?))?",
+		"action": "view_stock_summary",
+		"links": {"item_code": "Item", "warehouse": "Warehouse"},
+		"answer": "{message} matching {item_code}{warehouse_label}."
+	},
+	{
+		"name": "leads_in_period",
+		"pattern": VERB + r"(?:new\s+)?leads\s+(?:created\s+|added\s+)?" + PERIOD,
+		"action": "view_leads_summary",
+		"answer": "{message} created from {from_date} to {to_date}."
+	},
+	{
+		"name": "tasks",
+		"pattern": VERB + r"(?P<mine>my\s+)?(?:(?P<status>open|working|pending review|overdue|completed|cancelled)\s+)?tasks",
+		"action": "view_tasks_summary",
+		"mine_parameter": "assigned_to",
+		"answer": "{message}."
+	},
+	{
+		"name": "sales_orders_in_period",
+		"pattern": VERB + r"sales orders\s+(?:from\s+|created\s+)?" + PERIOD,
+		"action": "view_sales_orders",
+		"answer": "{message} dated {from_date} to {to_date}."
+	},
+	{
+		"name": "purchase_orders_in_period",
+		"pattern": VERB + r"purchase orders\s+(?:from\s+|created\s+)?" + PERIOD,
+		"action": "view_purchase_orders",
+		"answer": "{message} dated {from_date} to {to_date}."
+	},
+	{
+		"name": "projects",
+		"pattern": VERB + r"(?:(?P<status>open|completed|cancelled)\s+)?projects",
+		"action": "view_projects_summary",
+		"answer": "{message}."
+	}
+]
+
+class IntentMatcher:
+	"""
+	Deterministic fast path for common phrasings
+	Maps a message straight to an action and arguments so the turn can be
+	answered without calling the model. Anything that does not match a
+	pattern exactly is left to the model
+	"""
+	
+	def __init__(self, intents=None):
+		self.intents = [
+			{**intent, "regex": re.compile(intent["pattern"], re.IGNORECASE)}
+			for intent in (intents or INTENTS)
+		]
+	
+	def match(self, message, user):
+		"""
+		Get (intent, arguments) for a message, or None
+		"""
+		text = " ".join((message or "").split()).strip(" ?.!")
+		
+		for intent in self.intents:
+			found = intent["regex"].fullmatch(text)
+			if not found:
+				continue
+			
+			arguments = _get_arguments(intent, found.groupdict(), user)
+			if arguments is None:
+				continue
+			
+			return intent, arguments
+		
+		return None
+	
+	def render(self, intent, arguments, result):
+		"""
+		Write the answer for a matched turn from the intent's template
+		"""
+		if not result.get("success"):
+			return result.get("message") or "The request could not be completed."
+		
+		warehouse = arguments.get("warehouse")
+		
+		return intent["answer"].format(
+			message=result.get("message") or "",
+			item_code=arguments.get("item_code") or "",
+			warehouse_label=f" in {warehouse}" if warehouse else "",
+			from_date=arguments.get("from_date") or "",
+			to_date=arguments.get("to_date") or ""
+		)
+	
+	def count(self, intent=None):
+		"""
+		Record a matched (or, without intent, a missed) message
+		"""
+		cache = frappe.cache()
+		
+		if intent:
+			cache.incr(cache.make_key(f"{STATS_KEY}:matched"))
+			cache.incr(cache.make_key(f"{STATS_KEY}:intent:{intent['name']}"))
+		else:
+			cache.incr(cache.make_key(f"{STATS_KEY}:missed"))
+	
+	@staticmethod
+	def get_stats():
+		"""
+		Get fast-path coverage for this site: matched and missed messages
+		and the hits of each intent
+		"""
+		cache = frappe.cache()
+		stats = {}
+		
+		for counter in ["matched", "missed"]:
+			stats[counter] = int(cache.get(cache.make_key(f"{STATS_KEY}:{counter}")) or 0)
+		
+		total = stats["matched"] + stats["missed"]
+		stats["coverage"] = round(stats["matched"] / total * 100, 2) if total else 0
+		stats["intents"] = {
+			intent["name"]: int(cache.get(cache.make_key(f"{STATS_KEY}:intent:{intent['name']}")) or 0)
+			for intent in INTENTS
+		}
+		
+		return stats
+
+def _get_arguments(intent, groups, user):
+	"""
+	Turn matched groups into action arguments
+	Returns None if a referenced document cannot be found
+	"""
+	arguments = {}
+	
+	if groups.get("status"):
+		arguments["status"] = groups["status"].title()
+	
+	if groups.get("mine") and intent.get("mine_parameter"):
+		arguments[intent["mine_parameter"]] = user
+	
+	if groups.get("period"):
+		arguments["from_date"], arguments["to_date"] = get_period_dates(groups["period"].lower())
+	
+	for group, doctype in (intent.get("links") or {}).items():
+		if not groups.get(group):
+			continue
+		
+		name = _resolve_link(doctype, groups[group].strip(" \"'"))
+		if not name:
+			return None
+		
+		arguments[group] = name
+	
+	return arguments
+
+def get_period_dates(period):
+	"""
+	Get (from_date, to_date) for a named period
+	"""
+	today = nowdate()
+	
+	if period == "today":
+		return today, today
+	
+	if period == "yesterday":
+		yesterday = add_days(today, -1)
+		return yesterday, yesterday
+	
+	if period == "this week":
+		return str(get_first_day_of_week(today)), today
+	
+	if period == "last week":
+		start = get_first_day_of_week(add_days(today, -7))
+		return str(start), str(add_days(start, 6))
+	
+	if period == "this month":
+		return str(get_first_day(today)), today
+	
+	if period == "last month":
+		last_month = add_months(today, -1)
+		return str(get_first_day(last_month)), str(get_last_day(last_month))
+	
+	return None, None
+
+def _resolve_link(doctype, value):
+	"""
+	Find a document by name, or by its title field (item_name, warehouse_name)
+	"""
+	if frappe.db.exists(doctype, value):
+		return value
+	
+	title_field = {"Item": "item_name", "Warehouse": "warehouse_name"}.get(doctype)
+	if not title_field:
+		return None
+	
+	names = frappe.get_all(doctype, filters={title_field: value}, pluck="name", limit=2)
+	
+	# An ambiguous title is left to the model
+	return names[0] if len(names) == 1 else None
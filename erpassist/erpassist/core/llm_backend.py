@@ -0,0 +1,126 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+import hashlib
+import json
+import os
+from openai import OpenAI
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+# Request fields that decide the completion, everything else (timeouts) is ignored
+FINGERPRINT_FIELDS = ["model", "messages", "tools", "tool_choice", "temperature", "max_tokens", "stream"]
+
+def get_llm_client(settings, api_key=None):
+	"""
+	Build the chat completion client selected in ERPAssist Settings
+	
+	OpenAI: the OpenAI API, or any OpenAI-compatible server (such as the
+	local stub server) when LLM Base URL is set
+	Record: like OpenAI, and every completion is saved to the cassette directory
+	Replay: completions are served from the cassette directory, no network
+	"""
+	backend = settings.llm_backend or "OpenAI"
+	
+	if backend == "Replay":
+		return CassetteClient(CassetteStore(get_cassette_dir(settings)))
+	
+	if not api_key:
+		frappe.throw("OpenAI API Key not configured in ERPAssist Settings")
+	
+	# Retries are handled by ResilientLLMClient
+	client = OpenAI(api_key=api_key, base_url=settings.llm_base_url or None, max_retries=0)
+	
+	if backend == "Record":
+		return CassetteClient(CassetteStore(get_cassette_dir(settings)), client=client)
+	
+	return client
+
+def get_cassette_dir(settings):
+	return settings.cassette_dir or frappe.get_site_path("private", "erpassist_cassettes")
+
+def request_fingerprint(request):
+	"""
+	Stable hash of the parts of a completion request that affect the answer
+	"""
+	key = {field: request.get(field) for field in FINGERPRINT_FIELDS if request.get(field) is not None}
+	return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+class CassetteStore:
+	"""
+	Recorded completions on disk, one JSON file per request fingerprint
+	"""
+	
+	def __init__(self, path):
+		self.path = path
+	
+	def load(self, fingerprint):
+		file_path = self._file(fingerprint)
+		if not os.path.exists(file_path):
+			return None
+		
+		with open(file_path) as f:
+			return json.load(f)
+	
+	def save(self, fingerprint, request, response=None, chunks=None):
+		os.makedirs(self.path, exist_ok=True)
+		
+		cassette = {"request": request}
+		if chunks is not None:
+			cassette["chunks"] = chunks
+		else:
+			cassette["response"] = response
+		
+		# Write then rename so a concurrent reader never sees half a file
+		tmp_path = self._file(fingerprint) + ".tmp"
+		with open(tmp_path, "w") as f:
+			json.dump(cassette, f, indent=1, default=str)
+		os.replace(tmp_path, self._file(fingerprint))
+	
+	def _file(self, fingerprint):
+		return os.path.join(self.path, f"{fingerprint}.json")
+
+class CassetteClient:
+	"""
+	OpenAI-compatible client that records completions to, or replays them from,
+	a CassetteStore. Exposes client.chat.completions.create like the SDK
+	"""
+	
+	def __init__(self, store, client=None):
+		self.store = store
+		self.client = client
+		self.chat = frappe._dict(completions=frappe._dict(create=self.create))
+	
+	def create(self, **request):
+		fingerprint = request_fingerprint(request)
+		recorded = {key: value for key, value in request.items() if key in FINGERPRINT_FIELDS}
+		
+		if not self.client:
+			return self._replay(fingerprint, request)
+		
+		response = self.client.chat.completions.create(**request)
+		
+		if request.get("stream"):
+			return self._record_stream(fingerprint, recorded, response)
+		
+		self.store.save(fingerprint, recorded, response=response.model_dump())
+		return response
+	
+	def _replay(self, fingerprint, request):
+		cassette = self.store.load(fingerprint)
+		if not cassette:
+			raise LookupError(f"No recorded completion for request {fingerprint} in {self.store.path}")
+		
+		if request.get("stream"):
+			return iter([ChatCompletionChunk.model_validate(chunk) for chunk in cassette.get("chunks") or []])
+		
+		return ChatCompletion.model_validate(cassette["response"])
+	
+	def _record_stream(self, fingerprint, recorded, stream):
+		chunks = []
+		
+		for chunk in stream:
+			chunks.append(chunk.model_dump())
+			yield chunk
+		
+		self.store.save(fingerprint, recorded, chunks=chunks)
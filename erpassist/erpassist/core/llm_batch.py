@@ -0,0 +1,160 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+import json
+import os
+from openai import OpenAI
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# OpenAI batch statuses that mean the batch is still running
+PENDING_STATUSES = ("validating", "in_progress", "finalizing")
+
+class BatchFailedError(Exception):
+	pass
+
+def get_batch_backend(settings, api_key=None, client=None):
+	"""
+	Build the batch backend selected in ERPAssist Settings
+	
+	OpenAI Batch: the OpenAI Batch API, results arrive within 24 hours
+	Local: requests are run one by one through the regular chat client
+	(so also against the stub server or recorded cassettes) on the first poll
+	"""
+	if (settings.batch_backend or "OpenAI Batch") == "Local":
+		return LocalBatchBackend(client, frappe.get_site_path("private", "erpassist_batches"))
+	
+	if not api_key:
+		frappe.throw("OpenAI API Key not configured in ERPAssist Settings")
+	
+	return OpenAIBatchBackend(OpenAI(api_key=api_key, base_url=settings.llm_base_url or None))
+
+class OpenAIBatchBackend:
+	"""
+	Submits chat completion requests through the OpenAI Batch API
+	"""
+	
+	def __init__(self, client):
+		self.client = client
+	
+	def submit(self, requests):
+		"""
+		Submit [{"custom_id", "body"}] and return the batch id
+		"""
+		lines = "\n".join(json.dumps(_batch_line(request)) for request in requests)
+		
+		batch_file = self.client.files.create(
+			file=("erpassist_batch.jsonl", lines.encode()),
+			purpose="batch"
+		)
+		batch = self.client.batches.create(
+			input_file_id=batch_file.id,
+			endpoint=BATCH_ENDPOINT,
+			completion_window="24h"
+		)
+		
+		return batch.id
+	
+	def get_results(self, batch_id):
+		"""
+		Get {custom_id: {"response": completion} or {"error": message}},
+		or None while the batch is still running
+		"""
+		batch = self.client.batches.retrieve(batch_id)
+		
+		if batch.status in PENDING_STATUSES:
+			return None
+		
+		if batch.status != "completed":
+			raise BatchFailedError(f"Batch {batch_id} ended with status {batch.status}")
+		
+		results = {}
+		for file_id in [batch.output_file_id, batch.error_file_id]:
+			if file_id:
+				results.update(_parse_output(self.client.files.content(file_id).text))
+		
+		return results
+
+class LocalBatchBackend:
+	"""
+	Stand-in for a batch API: requests are kept in the site's private files
+	and run through a chat completion client when the batch is first polled
+	"""
+	
+	def __init__(self, client, path):
+		self.client = client
+		self.path = path
+	
+	def submit(self, requests):
+		os.makedirs(self.path, exist_ok=True)
+		batch_id = f"local-batch-{frappe.generate_hash(length=12)}"
+		
+		with open(self._file(batch_id, "input"), "w") as f:
+			for request in requests:
+				f.write(json.dumps(_batch_line(request)) + "\n")
+		
+		return batch_id
+	
+	def get_results(self, batch_id):
+		output_path = self._file(batch_id, "output")
+		
+		if not os.path.exists(output_path):
+			self._run(batch_id)
+		
+		with open(output_path) as f:
+			return _parse_output(f.read())
+	
+	def _run(self, batch_id):
+		with open(self._file(batch_id, "input")) as f:
+			lines = [json.loads(line) for line in f if line.strip()]
+		
+		output = []
+		for line in lines:
+			try:
+				completion = self.client.chat.completions.create(**line["body"])
+				output.append({
+					"custom_id": line["custom_id"],
+					"response": {"status_code": 200, "body": completion.model_dump()}
+				})
+			except Exception as e:
+				output.append({"custom_id": line["custom_id"], "error": {"message": str(e)}})
+		
+		# Write then rename so a concurrent poll never reads half the results
+		tmp_path = self._file(batch_id, "output") + ".tmp"
+		with open(tmp_path, "w") as f:
+			for line in output:
+				f.write(json.dumps(line, default=str) + "\n")
+		os.replace(tmp_path, self._file(batch_id, "output"))
+	
+	def _file(self, batch_id, kind):
+		return os.path.join(self.path, f"{batch_id}.{kind}.jsonl")
+
+def _batch_line(request):
+	return {
+		"custom_id": request["custom_id"],
+		"method": "POST",
+		"url": BATCH_ENDPOINT,
+		"body": request["body"]
+	}
+
+def _parse_output(text):
+	"""
+	Parse batch output JSONL into {custom_id: {"response"} or {"error"}}
+	"""
+	results = {}
+	
+	for line in text.splitlines():
+		if not line.strip():
+			continue
+		
+		row = json.loads(line)
+		response = row.get("response") or {}
+		
+		if row.get("error") or response.get("status_code") != 200:
+			error = row.get("error") or (response.get("body") or {}).get("error") or {}
+			results[row["custom_id"]] = {"error": error.get("message") or "Request failed"}
+		else:
+			results[row["custom_id"]] = {"response": response["body"]}
+	
+	return results
@@ -0,0 +1,200 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import openai
+
+BREAKER_KEY = "erpassist:llm_breaker"
+
+# Seconds a failure counts towards opening the breaker
+BREAKER_WINDOW = 60
+
+# Backoff between retries: full jitter up to base * 2^attempt, capped
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8
+
+# Latency samples kept per model, and needed before hedging starts
+LATENCY_SAMPLES = 200
+MIN_HEDGE_SAMPLES = 20
+
+RETRYABLE_ERRORS = (
+	openai.RateLimitError,
+	openai.InternalServerError,
+	openai.APIConnectionError
+)
+
+class CircuitOpenError(Exception):
+	"""
+	Raised without calling the model while the circuit breaker is open
+	"""
+	
+	def __init__(self):
+		super().__init__("The AI service is temporarily unavailable. Please try again in a minute.")
+
+class ResilientLLMClient:
+	"""
+	Wraps a chat completion client with per-call deadlines, jittered retries on
+	429/5xx, optional hedged requests past the observed p95 latency and a
+	circuit breaker shared by all workers through Redis
+	Exposes client.chat.completions.create like the SDK
+	"""
+	
+	def __init__(self, client, timeout=30, max_retries=2, hedge=False, breaker_threshold=5, breaker_cooldown=30):
+		self.client = client
+		self.timeout = timeout
+		self.max_retries = max_retries
+		self.hedge = hedge
+		self.breaker_threshold = breaker_threshold
+		self.breaker_cooldown = breaker_cooldown
+		self.latencies = {}
+		self.latency_lock = threading.Lock()
+		self.hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="erpassist-hedge") if hedge else None
+		self.chat = frappe._dict(completions=frappe._dict(create=self.create))
+	
+	def create(self, **request):
+		"""
+		Create a chat completion within the request's timeout (the overall deadline)
+		"""
+		deadline = time.monotonic() + (request.pop("timeout", None) or self.timeout)
+		probing = self._check_breaker()
+		
+		attempt = 0
+		while True:
+			remaining = deadline - time.monotonic()
+			request["timeout"] = max(min(self.timeout, remaining), 0.1)
+			
+			try:
+				response = self._call(request)
+			except RETRYABLE_ERRORS as e:
+				delay = self._backoff(attempt, e)
+				if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+					self._record_failure(reopen=probing)
+					raise
+				
+				time.sleep(delay)
+				attempt += 1
+				continue
+			except Exception:
+				# A request error says nothing about the service; free the probe
+				# so the next call can try again instead of waiting out its TTL
+				if probing:
+					self._release_probe()
+				raise
+			
+			if probing:
+				self._close_breaker()
+			
+			return response
+	
+	def _call(self, request):
+		# A stream returns at its first chunk, so only complete responses are
+		# timed; the samples are the hedging threshold for those alone
+		if request.get("stream"):
+			return self.client.chat.completions.create(**request)
+		
+		started = time.monotonic()
+		
+		if self.hedge:
+			response = self._hedged_call(request)
+		else:
+			response = self.client.chat.completions.create(**request)
+		
+		self._record_latency(request.get("model"), time.monotonic() - started)
+		return response
+	
+	def _hedged_call(self, request):
+		"""
+		Send a second identical request if the first is slower than p95
+		and return whichever finishes first
+		"""
+		threshold = self._p95(request.get("model"))
+		if threshold is None:
+			return self.client.chat.completions.create(**request)
+		
+		primary = self.hedge_pool.submit(self.client.chat.completions.create, **request)
+		done, _ = wait([primary], timeout=threshold)
+		if done:
+			return primary.result()
+		
+		hedged = self.hedge_pool.submit(self.client.chat.completions.create, **request)
+		done, _ = wait([primary, hedged], return_when=FIRST_COMPLETED)
+		
+		# Prefer a successful response if the first one to finish failed
+		first = done.pop()
+		if first.exception() is None:
+			return first.result()
+		
+		other = hedged if first is primary else primary
+		return other.result()
+	
+	def _backoff(self, attempt, error):
+		retry_after = None
+		response = getattr(error, "response", None)
+		if response is not None:
+			retry_after = response.headers.get("retry-after")
+		
+		try:
+			return min(float(retry_after), BACKOFF_CAP)
+		except (TypeError, ValueError):
+			return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+	
+	def _record_latency(self, model, seconds):
+		with self.latency_lock:
+			self.latencies.setdefault(model, deque(maxlen=LATENCY_SAMPLES)).append(seconds)
+	
+	def _p95(self, model):
+		with self.latency_lock:
+			samples = sorted(self.latencies.get(model) or [])
+		
+		if len(samples) < MIN_HEDGE_SAMPLES:
+			return None
+		
+		return samples[int(len(samples) * 0.95) - 1]
+	
+	def _check_breaker(self):
+		"""
+		Fail fast while the breaker is open; once the cooldown is over let a
+		single probe through. Returns True if this call is the probe
+		"""
+		cache = frappe.cache()
+		open_until = cache.get(cache.make_key(f"{BREAKER_KEY}:open_until"))
+		if not open_until:
+			return False
+		
+		if time.time() < float(open_until):
+			raise CircuitOpenError()
+		
+		if not cache.set(cache.make_key(f"{BREAKER_KEY}:probe"), 1, nx=True, ex=self.breaker_cooldown):
+			raise CircuitOpenError()
+		
+		return True
+	
+	def _record_failure(self, reopen=False):
+		cache = frappe.cache()
+		failures_key = cache.make_key(f"{BREAKER_KEY}:failures")
+		
+		failures = cache.incr(failures_key)
+		if failures == 1:
+			cache.expire(failures_key, BREAKER_WINDOW)
+		
+		# A failed probe reopens the breaker straight away
+		if reopen or failures >= self.breaker_threshold:
+			cache.set(cache.make_key(f"{BREAKER_KEY}:open_until"), time.time() + self.breaker_cooldown)
+			cache.delete(cache.make_key(f"{BREAKER_KEY}:probe"))
+	
+	def _release_probe(self):
+		cache = frappe.cache()
+		cache.delete(cache.make_key(f"{BREAKER_KEY}:probe"))
+	
+	def _close_breaker(self):
+		cache = frappe.cache()
+		cache.delete(
+			cache.make_key(f"{BREAKER_KEY}:open_until"),
+			cache.make_key(f"{BREAKER_KEY}:probe"),
+			cache.make_key(f"{BREAKER_KEY}:failures")
+		)
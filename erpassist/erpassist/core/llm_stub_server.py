@@ -0,0 +1,258 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+"""
+Local OpenAI-compatible stand-in for the chat completions API
+
+Serves scripted (or recorded) completions and tool calls with configurable
+latency, so the chat pipeline can be tested and benchmarked offline.
+Point ERPAssist Settings > LLM Base URL at it, e.g. http://127.0.0.1:8089/v1
+
+	python -m erpassist.erpassist.core.llm_stub_server --port 8089 --script script.json
+
+Script format:
+
+	{
+		"latency": 0.3,
+		"token_delay": 0.01,
+		"tool_reply": "Here is what I found.",
+		"rules": [
+			{"match": "sales order", "tool_calls": [{"name": "view_sales_orders", "arguments": {}}]},
+			{"match": ".*", "content": "Hello from the stub."}
+		]
+	}
+
+Rules are matched in order against the last user message (regex, case
+insensitive). When the last message is a tool result, tool_reply is returned
+"""
+
+import argparse
+import itertools
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_SCRIPT = {
+	"latency": 0,
+	"token_delay": 0,
+	"tool_reply": "Here is what I found.",
+	"rules": [{"match": ".*", "content": "This is a scripted reply from the ERPAssist stub server."}]
+}
+
+_ids = itertools.count(1)
+
+class StubLLM:
+	"""
+	Picks the scripted or recorded completion for a request
+	"""
+	
+	def __init__(self, script=None, cassette_dir=None):
+		self.script = {**DEFAULT_SCRIPT, **(script or {})}
+		self.store = None
+		
+		if cassette_dir:
+			from erpassist.erpassist.core.llm_backend import CassetteStore
+			self.store = CassetteStore(cassette_dir)
+	
+	def recorded(self, request):
+		"""
+		Get the recorded cassette for a request, if any
+		"""
+		if not self.store:
+			return None
+		
+		from erpassist.erpassist.core.llm_backend import request_fingerprint
+		return self.store.load(request_fingerprint(request))
+	
+	def reply(self, request):
+		"""
+		Get (content, tool_calls) for a request from the script
+		"""
+		messages = request.get("messages") or []
+		
+		if messages and messages[-1].get("role") == "tool":
+			return self.script["tool_reply"], []
+		
+		last_user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+		offered = {tool["function"]["name"] for tool in request.get("tools") or []}
+		
+		for rule in self.script["rules"]:
+			if not re.search(rule.get("match", ".*"), last_user, re.IGNORECASE):
+				continue
+			
+			# Skip tool rules for tools the caller did not offer
+			tool_calls = rule.get("tool_calls") or []
+			if tool_calls and not all(call["name"] in offered for call in tool_calls):
+				continue
+			
+			return rule.get("content"), tool_calls
+		
+		return "", []
+
+def make_completion(request, content, tool_calls):
+	completion_id = f"chatcmpl-stub-{next(_ids)}"
+	message = {"role": "assistant", "content": content or None}
+	
+	if tool_calls:
+		message["tool_calls"] = [
+			{
+				"id": f"call_stub_{completion_id}_{index}",
+				"type": "function",
+				"function": {"name": call["name"], "arguments": json.dumps(call.get("arguments") or {})}
+			}
+			for index, call in enumerate(tool_calls)
+		]
+	
+	completion_tokens = len((content or "").split())
+	
+	return {
+		"id": completion_id,
+		"object": "chat.completion",
+		"created": int(time.time()),
+		"model": request.get("model") or "stub",
+		"choices": [{
+			"index": 0,
+			"message": message,
+			"finish_reason": "tool_calls" if tool_calls else "stop"
+		}],
+		"usage": {
+			"prompt_tokens": len(json.dumps(request.get("messages") or [])) // 4,
+			"completion_tokens": completion_tokens,
+			"total_tokens": len(json.dumps(request.get("messages") or [])) // 4 + completion_tokens
+		}
+	}
+
+def make_chunks(request, content, tool_calls):
+	"""
+	Split a scripted reply into chat.completion.chunk payloads
+	"""
+	completion_id = f"chatcmpl-stub-{next(_ids)}"
+	base = {
+		"id": completion_id,
+		"object": "chat.completion.chunk",
+		"created": int(time.time()),
+		"model": request.get("model") or "stub"
+	}
+	
+	def chunk(delta, finish_reason=None):
+		return {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+	
+	yield chunk({"role": "assistant", "content": ""})
+	
+	for word in re.findall(r"\S+\s*", content or ""):
+		yield chunk({"content": word})
+	
+	for index, call in enumerate(tool_calls):
+		yield chunk({"tool_calls": [{
+			"index": index,
+			"id": f"call_stub_{completion_id}_{index}",
+			"type": "function",
+			"function": {"name": call["name"], "arguments": json.dumps(call.get("arguments") or {})}
+		}]})
+	
+	yield chunk({}, "tool_calls" if tool_calls else "stop")
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+	# Keep-alive, like the real API, so client connection pooling is exercised
+	protocol_version = "HTTP/1.1"
+	llm = None
+	
+	def do_GET(self):
+		if self.path.rstrip("/").endswith("/models"):
+			return self._send_json({"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "erpassist"}]})
+		
+		self._send_json({"error": {"message": "Not found"}}, status=404)
+	
+	def do_POST(self):
+		if not self.path.rstrip("/").endswith("/chat/completions"):
+			return self._send_json({"error": {"message": "Not found"}}, status=404)
+		
+		length = int(self.headers.get("Content-Length") or 0)
+		request = json.loads(self.rfile.read(length) or b"{}")
+		script = self.llm.script
+		
+		time.sleep(script["latency"])
+		
+		recorded = self.llm.recorded(request)
+		if recorded:
+			if request.get("stream"):
+				return self._send_stream(recorded.get("chunks") or [], script["token_delay"])
+			return self._send_json(recorded["response"])
+		
+		content, tool_calls = self.llm.reply(request)
+		
+		if request.get("stream"):
+			return self._send_stream(make_chunks(request, content, tool_calls), script["token_delay"])
+		
+		time.sleep(script["token_delay"] * len((content or "").split()))
+		self._send_json(make_completion(request, content, tool_calls))
+	
+	def _send_json(self, payload, status=200):
+		body = json.dumps(payload).encode()
+		self.send_response(status)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+	
+	def _send_stream(self, chunks, token_delay):
+		self.send_response(200)
+		self.send_header("Content-Type", "text/event-stream")
+		self.send_header("Cache-Control", "no-cache")
+		self.send_header("Connection", "close")
+		self.end_headers()
+		
+		for chunk in chunks:
+			self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+			self.wfile.flush()
+			time.sleep(token_delay)
+		
+		self.wfile.write(b"data: [DONE]\n\n")
+		self.wfile.flush()
+		self.close_connection = True
+	
+	def log_message(self, format, *args):
+		pass
+
+def serve(host="127.0.0.1", port=8089, script=None, cassette_dir=None):
+	"""
+	Run the stub server until interrupted
+	"""
+	handler = type("ConfiguredStubRequestHandler", (StubRequestHandler,), {
+		"llm": StubLLM(script, cassette_dir)
+	})
+	server = ThreadingHTTPServer((host, port), handler)
+	print(f"ERPAssist LLM stub listening on http://{host}:{port}/v1")
+	
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.server_close()
+
+def main():
+	parser = argparse.ArgumentParser(description="OpenAI-compatible stub server for ERPAssist")
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--port", type=int, default=8089)
+	parser.add_argument("--script", help="JSON script with rules, latency and token_delay")
+	parser.add_argument("--cassettes", help="Directory of recorded completions to serve first")
+	parser.add_argument("--latency", type=float, help="Seconds before each response, overrides the script")
+	parser.add_argument("--token-delay", type=float, help="Seconds per streamed token, overrides the script")
+	args = parser.parse_args()
+	
+	script = {}
+	if args.script:
+		with open(args.script) as f:
+			script = json.load(f)
+	
+	if args.latency is not None:
+		script["latency"] = args.latency
+	if args.token_delay is not None:
+		script["token_delay"] = args.token_delay
+	
+	serve(args.host, args.port, script, args.cassettes)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,112 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+import json
+import re
+
+# Words that suggest a message asks for more than one thing
+MULTI_INTENT_WORDS = {"and", "compare", "versus", "vs", "then", "also", "after", "both"}
+
+# Messages longer than this (in words) go to the large model
+MAX_SIMPLE_WORDS = 25
+
+# Relevance-ranked candidates inspected when routing a message
+ROUTING_CANDIDATES = 2
+
+class ModelRouter:
+	"""
+	Routes simple single-action QUERY turns to a small model and escalates
+	multi-step, DRAFT and high-risk work to the large model
+	"""
+	
+	def __init__(self, large_model, small_model, action_retriever):
+		self.large_model = large_model
+		self.small_model = small_model
+		self.action_retriever = action_retriever
+		self.logger = frappe.logger("erpassist_routing")
+	
+	def initial_model(self, message, available_actions):
+		"""
+		Pick the model for the first step of a turn
+		Returns (model, reason)
+		"""
+		words = re.findall(r"[a-z0-9]+", (message or "").lower())
+		
+		if len(words) > MAX_SIMPLE_WORDS:
+			return self.large_model, "long message"
+		
+		if MULTI_INTENT_WORDS.intersection(words):
+			return self.large_model, "multiple intents"
+		
+		actions = {action["action_name"]: action for action in available_actions}
+		candidates = self.action_retriever.top_actions(message, list(actions), ROUTING_CANDIDATES)
+		
+		# top_actions returns every candidate when nothing matched
+		if not candidates or len(candidates) > ROUTING_CANDIDATES:
+			return self.large_model, "no matching action"
+		
+		for name in candidates:
+			if not _is_low_risk_query(actions[name]):
+				return self.large_model, f"{name} is not a low risk query"
+		
+		return self.small_model, "simple query"
+	
+	def next_model(self, model, step_number, calls):
+		"""
+		Pick the model for the step after calls were executed
+		The small model may only summarise low risk query results
+		"""
+		if model == self.large_model:
+			return model, "already escalated"
+		
+		if step_number >= 2:
+			return self.large_model, "multi-step"
+		
+		for call in calls:
+			if not _is_low_risk_query(call["action"]):
+				return self.large_model, f"{call['name']} is not a low risk query"
+		
+		return model, "simple query results"
+	
+	def validate(self, calls, tools):
+		"""
+		Check the small model's tool calls against the offered tool schemas
+		Returns a list of problems, empty when every call is valid
+		"""
+		schemas = {tool["function"]["name"]: tool["function"].get("parameters") or {} for tool in tools or []}
+		errors = []
+		
+		for call in calls:
+			if call["name"] not in schemas:
+				errors.append(f"{call['name']}: not offered")
+				continue
+			
+			if call.get("arguments_error"):
+				errors.append(f"{call['name']}: arguments are not valid JSON")
+				continue
+			
+			missing = [field for field in schemas[call["name"]].get("required") or [] if field not in call["arguments"]]
+			if missing:
+				errors.append(f"{call['name']}: missing {', '.join(missing)}")
+		
+		return errors
+	
+	def log(self, steps):
+		"""
+		Log the models and latencies of a turn for threshold tuning
+		"""
+		self.logger.info(json.dumps({
+			"steps": [
+				{
+					"model": step.get("model"),
+					"route": step.get("route"),
+					"llm_ms": step.get("llm_ms"),
+					"fallback": step.get("fallback")
+				}
+				for step in steps
+			]
+		}))
+
+def _is_low_risk_query(action):
+	return action.get("action_category") == "QUERY" and (action.get("risk_level") or "Low") == "Low"
@@ -2,82 +2,168 @@
 # For license information, please see license.txt
 
 import frappe
+import hashlib
 import json
-from openai import OpenAI
+import time
+from concurrent.futures import ThreadPoolExecutor
 from erpassist.erpassist.core.action_registry import ActionRegistry
+from erpassist.erpassist.core.action_retriever import ActionRetriever
 from erpassist.erpassist.core.permission_guard import PermissionGuard
 from erpassist.erpassist.core.executor import ActionExecutor
 from erpassist.erpassist.core.audit_logger import AuditLogger
+from erpassist.erpassist.core.response_cache import ResponseCache, normalize_message, fingerprint
+from erpassist.erpassist.core.single_flight import SingleFlight, get_permission_scope
+from erpassist.erpassist.core.permission_context import PermissionContext, get_permission_context
+from erpassist.erpassist.core.llm_backend import get_llm_client
+from erpassist.erpassist.core.llm_client import ResilientLLMClient, CircuitOpenError
+from erpassist.erpassist.core.model_router import ModelRouter
+from erpassist.erpassist.core.intent_matcher import IntentMatcher
+from erpassist.erpassist.core.history_window import HistoryWindow, SUMMARY_BATCH, enqueue_summary_update
+
+STREAM_EVENT = "erpassist_stream"
+
+# Seconds to coalesce token deltas between realtime publishes
+STREAM_FLUSH_INTERVAL = 0.05
+
+# Largest tool result (in characters) fed back to the model
+TOOL_RESULT_MAX_CHARS = 8000
+
+# Distinct role sets kept in the compiled prompt cache
+PROMPT_CACHE_SIZE = 256
+
+# Static head of the system prompt, kept byte-identical across requests
+# so the provider can serve it from its prompt cache
+SYSTEM_PROMPT = """You are ERPAssist, an AI assistant for ERPNext. You help users with their ERP tasks.
+
+IMPORTANT RULES:
+1. NEVER guess or hallucinate data. Only use data from ERPNext via the available functions.
+2. Always respect user permissions. You can only perform actions the user has permission for.
+3. For financial actions (POST) and payroll (EXECUTE_PAYROLL), always ask for explicit confirmation.
+4. Be concise and professional in your responses.
+5. When showing data, format it clearly with tables when appropriate.
+
+The available actions are provided as functions, each described with its category and module.
+When a user asks about data, use the appropriate query function. When they want to create or modify something, use the appropriate action function. Always explain what you're going to do before calling a function that requires confirmation."""
 
 class AIOrchestrator:
 	"""
 	Main orchestrator that processes user messages and coordinates
 	all components of the ERPAssist system
+
+	Instances are long-lived and shared across requests, use
+	orchestrator_pool.get_orchestrator() instead of constructing directly
 	"""
 	
 	def __init__(self):
 		self.settings = frappe.get_single("ERPAssist Settings")
+		self.model = self.settings.ai_model or "gpt-4o"
 		self.action_registry = ActionRegistry()
-		self.permission_guard = PermissionGuard()
-		self.executor = ActionExecutor()
+		self.action_retriever = ActionRetriever(self.action_registry.actions.values())
 		
-		# Initialize OpenAI client
-		api_key = self.settings.get_password("openai_api_key")
-		if not api_key:
-			frappe.throw("OpenAI API Key not configured in ERPAssist Settings")
+		# role set hash -> compiled system prompt and tools, lives as long as the registry
+		self.prompt_bundles = {}
 		
-		self.client = OpenAI(api_key=api_key)
-		self.model = self.settings.ai_model or "gpt-4o"
+		self.model_router = None
+		if self.settings.enable_model_routing and self.settings.small_model:
+			self.model_router = ModelRouter(self.model, self.settings.small_model, self.action_retriever)
+		
+		self.intent_matcher = None
+		if self.settings.enable_intent_fast_path:
+			self.intent_matcher = IntentMatcher()
+		
+		self.single_flight = None
+		if self.settings.enable_request_coalescing:
+			self.single_flight = SingleFlight()
+		
+		self.response_cache = None
+		if self.settings.enable_response_cache:
+			self.response_cache = ResponseCache(ttl=self.settings.response_cache_ttl or 300)
+		self.permission_guard = PermissionGuard(self.action_registry)
+		self.executor = ActionExecutor(self.action_registry)
+		
+		# Initialize LLM client (OpenAI, an OpenAI-compatible server or cassettes)
+		api_key = self.settings.get_password("openai_api_key", raise_exception=False)
+		
+		# The client keeps its HTTP connection pool alive across requests
+		self.client = ResilientLLMClient(
+			get_llm_client(self.settings, api_key),
+			timeout=self.settings.llm_timeout or 30,
+			max_retries=self.settings.llm_max_retries if self.settings.llm_max_retries is not None else 2,
+			hedge=bool(self.settings.enable_hedged_requests),
+			breaker_threshold=self.settings.circuit_breaker_threshold or 5,
+			breaker_cooldown=self.settings.circuit_breaker_cooldown or 30
+		)
+		self.history_window = HistoryWindow(self.settings.history_token_budget or 3000, self.model)
+		
+		# Bounded pool for running independent QUERY actions concurrently
+		self.action_pool = ThreadPoolExecutor(
+			max_workers=self.settings.max_parallel_actions or 4,
+			thread_name_prefix="erpassist-action"
+		)
 	
-	def process_message(self, message, session_id, user):
+	def process_message(self, message, session_id, user, stream_id=None):
 		"""
 		Process a user message and generate a response
+		If stream_id is given, text deltas are pushed to the user over realtime
 		"""
 		try:
-			# Get user roles
-			user_roles = frappe.get_roles(user)
+			# Roles and permission answers are looked up once per turn
+			permissions = PermissionContext(user)
+			user_roles = permissions.roles
 			
-			# Get available actions for this user
-			available_actions = self.action_registry.get_available_actions(user_roles)
+			# Compiled prompt and tools for this user's role set
+			bundle = self._get_prompt_bundle(user_roles)
 			
-			# Build context for AI
-			system_prompt = self._build_system_prompt(user_roles, available_actions)
+			# Common phrasings are answered without the model
+			if self.intent_matcher:
+				matched = self._run_fast_path(message, bundle, user, session_id, permissions)
+				if matched:
+					return matched
 			
 			# Get session history for context
-			session_history = self._get_session_history(session_id)
+			session_history = self._get_session_history(session_id, message)
 			
-			# Call OpenAI API
-			messages = [
-				{"role": "system", "content": system_prompt},
-				*session_history,
-				{"role": "user", "content": message}
-			]
+			# Read-only turns seen before skip the model entirely. Follow-ups
+			# depend on the conversation, so only opening messages are replayed
+			if self.response_cache and not session_history:
+				cached = self._replay_cached_turn(message, bundle.role_key, user, session_id, permissions)
+				if cached:
+					return cached
 			
-			response = self.client.chat.completions.create(
-				model=self.model,
-				messages=messages,
-				max_tokens=self.settings.max_tokens or 4000,
-				temperature=0.7,
-				functions=self._get_function_definitions(available_actions),
-				function_call="auto"
-			)
-			
-			# Process response
-			choice = response.choices[0]
-			
-			# Check if AI wants to call a function
-			if choice.message.function_call:
-				return self._handle_function_call(
-					choice.message.function_call,
-					user,
-					session_id
+			# Identical questions asked at the same time share one model turn
+			if self.single_flight:
+				key = "turn:" + hashlib.sha1(json.dumps(
+					[get_permission_scope(user, permissions), normalize_message(message), session_history],
+					sort_keys=True
+				).encode()).hexdigest()
+				
+				computed = []
+				
+				def answer():
+					computed.append(True)
+					return self._answer_with_model(message, bundle, session_history, user, session_id, stream_id, permissions)
+				
+				response = self.single_flight.run(
+					key,
+					answer,
+					lock_ttl=(self.settings.agent_time_budget or 60) + 10,
+					shareable=self._is_shareable_turn
 				)
-			else:
-				return {
-					"message": choice.message.content,
-					"type": "text",
-					"action_taken": None
-				}
+				
+				# Actions run by the leader were audited for the leader only
+				if not computed:
+					self._log_shared_turn(response, user, session_id)
+				
+				return response
+			
+			return self._answer_with_model(message, bundle, session_history, user, session_id, stream_id, permissions)
+		
+		except CircuitOpenError as e:
+			return {
+				"message": str(e),
+				"type": "error",
+				"error": "LLM circuit open"
+			}
 				
 		except Exception as e:
 			frappe.log_error(frappe.get_traceback(), "AI Orchestrator Error")
@@ -87,113 +173,569 @@ class AIOrchestrator:
 				"error": str(e)
 			}
 	
-	def _build_system_prompt(self, user_roles, available_actions):
+	def build_batch_request(self, message, user, permissions=None):
 		"""
-		Build the system prompt for the AI with context about ERPNext and available actions
+		Build the first chat completion request for a message from a batch run
+		Batch prompts start fresh sessions, so no history is sent
 		"""
-		actions_desc = "\n".join([
-			f"- {action['name']}: {action.get('description', '')} (Category: {action['category']}, Module: {action['module']})"
-			for action in available_actions
-		])
+		permissions = get_permission_context(user, permissions)
+		bundle = self._get_prompt_bundle(permissions.roles)
+		offered_actions = self._select_actions(message, bundle.actions)
 		
-		return f"""You are ERPAssist, an AI assistant for ERPNext. You help users with their ERP tasks.
-
-Current User Roles: {', '.join(user_roles)}
-
-IMPORTANT RULES:
-1. NEVER guess or hallucinate data. Only use data from ERPNext via the available functions.
-2. Always respect user permissions. You can only perform actions the user has permission for.
-3. For financial actions (POST) and payroll (EXECUTE_PAYROLL), always ask for explicit confirmation.
-4. Be concise and professional in your responses.
-5. When showing data, format it clearly with tables when appropriate.
-
-AVAILABLE ACTIONS:
-{actions_desc}
+		request = {
+			"model": self.model,
+			"messages": [
+				{"role": "system", "content": bundle.system_prompt},
+				{"role": "user", "content": message}
+			],
+			"max_tokens": self.settings.max_tokens or 4000,
+			"temperature": 0.7
+		}
+		
+		if offered_actions:
+			request["tools"] = [bundle.tools_by_name[action["action_name"]] for action in offered_actions]
+			request["tool_choice"] = "auto"
+		
+		return request
+	
+	def _answer_with_model(self, message, bundle, session_history, user, session_id, stream_id=None, permissions=None):
+		"""
+		Answer a message with the model, executing the actions it selects
+		"""
+		# Only offer the actions relevant to this message
+		offered_actions = self._select_actions(message, bundle.actions)
+		
+		# Call OpenAI API
+		messages = [
+			{"role": "system", "content": bundle.system_prompt},
+			*session_history,
+			{"role": "user", "content": message}
+		]
+		
+		tools = [bundle.tools_by_name[action["action_name"]] for action in offered_actions]
+		
+		# Every allowed action, used if the model asks for one we pruned
+		fallback_tools = None
+		if len(offered_actions) < len(bundle.actions):
+			fallback_tools = bundle.tools
+		
+		# Simple lookups can start on the small model
+		model, route = self.model, None
+		if self.model_router:
+			model, route = self.model_router.initial_model(message, bundle.actions)
+		
+		response = self._run_agent_loop(messages, tools, user, session_id, stream_id, fallback_tools, model, route, permissions)
+		
+		if self.model_router:
+			self.model_router.log(response.get("steps") or [])
+		
+		# The selection is shared by every conversation, so only cache turns
+		# that did not depend on earlier messages
+		if self.response_cache and not session_history:
+			self._cache_turn(message, bundle.role_key, user, response)
+		
+		return response
+	
+	def _run_agent_loop(self, messages, tools, user, session_id, stream_id=None, fallback_tools=None, model=None, route=None, permissions=None):
+		"""
+		Call the model, execute the actions it asks for and feed the results
+		back until it answers in text, hits max steps or runs out of time
+		Each step's model and action timings are returned under "steps"
+		If the model asks for an action that was not offered, the step is
+		retried once with fallback_tools
+		With model routing, a step whose small-model tool calls fail
+		validation is retried on the large model
+		"""
+		model = model or self.model
+		max_steps = self.settings.max_agent_steps or 5
+		deadline = time.monotonic() + (self.settings.agent_time_budget or 60)
+		
+		steps = []
+		results = []
+		executed_calls = []
+		
+		for step_number in range(1, max_steps + 1):
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				break
+			
+			request = {
+				"model": model,
+				"messages": messages,
+				"max_tokens": self.settings.max_tokens or 4000,
+				"temperature": 0.7,
+				"timeout": remaining
+			}
+			
+			if tools:
+				request["tools"] = tools
+				request["tool_choice"] = "auto"
+			
+			step = {"step": step_number, "model": model, "route": route}
+			steps.append(step)
+			started = time.monotonic()
+			
+			if stream_id:
+				response_message = self._stream_completion(request, user, stream_id)
+			else:
+				response = self.client.chat.completions.create(**request)
+				response_message = response.choices[0].message
+			
+			step["llm_ms"] = _elapsed_ms(started)
+			
+			# A text answer ends the turn
+			if not response_message.tool_calls:
+				return {
+					"message": response_message.content,
+					"type": "multi" if results else "text",
+					"action_taken": ", ".join(call["name"] for call in executed_calls) or None,
+					"results": results,
+					"calls": executed_calls,
+					"steps": steps
+				}
+			
+			calls = self._parse_tool_calls(response_message.tool_calls)
+			step["actions"] = [call["name"] for call in calls]
+			
+			offered = {tool["function"]["name"] for tool in tools or []}
+			if fallback_tools and any(call["name"] not in offered for call in calls):
+				step["expanded_tools"] = True
+				tools = fallback_tools
+				fallback_tools = None
+				continue
+			
+			# Invalid tool calls from the small model are redone by the large one
+			if model != self.model:
+				errors = self.model_router.validate(calls, tools)
+				if errors:
+					step["fallback"] = errors
+					model, route = self.model, "small model tool call failed validation"
+					continue
+			
+			blocked = self._check_calls(calls)
+			if blocked:
+				blocked["steps"] = steps
+				return blocked
+			
+			started = time.monotonic()
+			step_results = self._execute_calls(calls, user, session_id, permissions)
+			step["actions_ms"] = _elapsed_ms(started)
+			step["action_timings"] = [
+				{"action": call["name"], "ms": result.pop("_elapsed_ms", None)}
+				for call, result in zip(calls, step_results)
+			]
+			
+			results.extend(step_results)
+			executed_calls.extend(
+				{"name": call["name"], "arguments": call["arguments"], "step": step_number}
+				for call in calls
+			)
+			
+			if model != self.model:
+				model, route = self.model_router.next_model(model, step_number, calls)
+			
+			# Feed the results back so the model can summarise or chain
+			messages.append({
+				"role": "assistant",
+				"content": response_message.content,
+				"tool_calls": [
+					{
+						"id": call["id"],
+						"type": "function",
+						"function": {"name": call["name"], "arguments": call["raw_arguments"]}
+					}
+					for call in calls
+				]
+			})
+			
+			for call, result in zip(calls, step_results):
+				messages.append({
+					"role": "tool",
+					"tool_call_id": call["id"],
+					"content": tool_result_content(result)
+				})
+		
+		# Out of steps or time: hand back what was gathered so far
+		return {
+			"message": "I could not finish within the allowed steps or time. Here is what I found so far:\n"
+				+ "\n".join(result.get("message") or "" for result in results),
+			"type": "multi" if results else "text",
+			"action_taken": ", ".join(call["name"] for call in executed_calls) or None,
+			"results": results,
+			"calls": executed_calls,
+			"steps": steps
+		}
+	
+	def _replay_cached_turn(self, message, role_key, user, session_id, permissions=None):
+		"""
+		Answer a message from the response cache without calling the model
+		The model's answer is only reused for the user it was written for,
+		within the TTL; otherwise the reply is built from the handler results,
+		cached ones reused and the others re-run
+		"""
+		selection = self.response_cache.get_selection(message, role_key)
+		if not selection:
+			return None
+		
+		for call in selection["calls"]:
+			action = self.action_registry.get_action(call["name"])
+			if not action or not ResponseCache.is_cacheable(action):
+				return None
+		
+		turn = self.response_cache.get_turn(message, role_key, user)
+		if turn:
+			answer, results = turn["answer"], turn["results"]
+		else:
+			results = []
+			
+			for call in selection["calls"]:
+				result = self.response_cache.get_result(call["name"], call["arguments"], user)
+				if not result:
+					result = self.execute_action(call["name"], call["arguments"], user, session_id, permissions)
+					if result.get("success"):
+						self.response_cache.set_result(call["name"], call["arguments"], user, result)
+				
+				results.append(result)
+			
+			answer = "\n".join(result.get("message") or "" for result in results)
+		
+		return {
+			"message": answer,
+			"type": "multi",
+			"action_taken": ", ".join(call["name"] for call in selection["calls"]),
+			"results": results,
+			"cached": True
+		}
+	
+	def _run_fast_path(self, message, bundle, user, session_id, permissions=None):
+		"""
+		Answer a message matched by the intent matcher with a templated reply
+		Returns None if no intent matches an action offered to the user
+		"""
+		matched = self.intent_matcher.match(message, user)
+		
+		# Same role check as the model's tool list, execute_action checks the rest
+		if matched and matched[0]["action"] not in bundle.tools_by_name:
+			matched = None
+		
+		if not matched:
+			self.intent_matcher.count()
+			return None
+		
+		intent, arguments = matched
+		self.intent_matcher.count(intent)
+		
+		started = time.monotonic()
+		result = self.execute_action(intent["action"], arguments, user, session_id, permissions)
+		
+		return {
+			"message": self.intent_matcher.render(intent, arguments, result),
+			"type": "multi",
+			"action_taken": intent["action"],
+			"results": [result],
+			"calls": [{"name": intent["action"], "arguments": arguments, "step": 1}],
+			"steps": [{"step": 1, "intent": intent["name"], "actions_ms": _elapsed_ms(started)}],
+			"fast_path": True
+		}
+	
+	def _is_shareable_turn(self, response):
+		"""
+		Only answers built from QUERY actions may be shared with other users
+		Confirmations and errors belong to the session that produced them
+		"""
+		if response.get("type") not in ("text", "multi"):
+			return False
+		
+		for call in response.get("calls") or []:
+			action = self.action_registry.get_action(call["name"])
+			if not action or action.get("action_category") != "QUERY":
+				return False
+		
+		return True
+	
+	def _cache_turn(self, message, role_key, user, response):
+		"""
+		Remember a successful single-step read-only turn for replay
+		"""
+		calls = response.get("calls")
+		if not calls or response.get("type") != "multi":
+			return
+		
+		# Later steps may depend on earlier data, so only cache one-step turns
+		if any(call["step"] != 1 for call in calls):
+			return
+		
+		for call, result in zip(calls, response.get("results") or []):
+			action = self.action_registry.get_action(call["name"])
+			if not action or not ResponseCache.is_cacheable(action) or not result.get("success"):
+				return
+		
+		for call, result in zip(calls, response["results"]):
+			self.response_cache.set_result(call["name"], call["arguments"], user, result)
+		
+		self.response_cache.set_selection(
+			message,
+			role_key,
+			[{"name": call["name"], "arguments": call["arguments"]} for call in calls]
+		)
+		self.response_cache.set_turn(message, role_key, user, response.get("message"), response["results"])
+	
+	def _stream_completion(self, request, user, stream_id):
+		"""
+		Call the model with stream=True, publishing text deltas to the user
+		Returns the assembled message with content and tool_calls
+		"""
+		content = []
+		tool_calls = {}
+		pending = []
+		last_publish = 0
+		
+		for chunk in self.client.chat.completions.create(stream=True, **request):
+			if not chunk.choices:
+				continue
+			
+			delta = chunk.choices[0].delta
+			
+			# Tool calls arrive as fragments keyed by their index
+			for tool_delta in delta.tool_calls or []:
+				call = tool_calls.setdefault(tool_delta.index, {"id": "", "name": [], "arguments": []})
+				if tool_delta.id:
+					call["id"] = tool_delta.id
+				if tool_delta.function:
+					call["name"].append(tool_delta.function.name or "")
+					call["arguments"].append(tool_delta.function.arguments or "")
+			
+			if delta.content:
+				content.append(delta.content)
+				pending.append(delta.content)
+				
+				# First token goes out immediately, later ones are coalesced
+				now = time.monotonic()
+				if now - last_publish >= STREAM_FLUSH_INTERVAL:
+					self._publish_delta(user, stream_id, "".join(pending))
+					pending = []
+					last_publish = now
+		
+		if pending:
+			self._publish_delta(user, stream_id, "".join(pending))
+		
+		frappe.publish_realtime(STREAM_EVENT, {"stream_id": stream_id, "done": True}, user=user)
+		
+		assembled_calls = [
+			frappe._dict(
+				id=call["id"],
+				type="function",
+				function=frappe._dict(name="".join(call["name"]), arguments="".join(call["arguments"]))
+			)
+			for index, call in sorted(tool_calls.items())
+		]
+		
+		return frappe._dict(content="".join(content), tool_calls=assembled_calls or None)
+	
+	def _publish_delta(self, user, stream_id, delta):
+		"""
+		Push a chunk of assistant text to the user's browser
+		"""
+		frappe.publish_realtime(STREAM_EVENT, {"stream_id": stream_id, "delta": delta}, user=user)
+	
+	def _select_actions(self, message, available_actions):
+		"""
+		Pick the actions most relevant to the message using the local BM25 index
+		"""
+		top_k = self.settings.max_tools_per_turn
+		if not top_k or len(available_actions) <= top_k:
+			return available_actions
+		
+		selected = set(self.action_retriever.top_actions(
+			message,
+			[action["action_name"] for action in available_actions],
+			top_k
+		))
+		
+		return [action for action in available_actions if action["action_name"] in selected]
+	
+	def _get_prompt_bundle(self, user_roles):
+		"""
+		Get the system prompt and tool definitions compiled for a role set
+		Compiled once per distinct role set and dropped with the registry
+		"""
+		roles = sorted(set(user_roles))
+		key = hashlib.sha1("\n".join(roles).encode()).hexdigest()
+		
+		bundle = self.prompt_bundles.get(key)
+		if bundle:
+			return bundle
+		
+		# Stable ordering keeps the tool list identical between requests
+		actions = sorted(
+			self.action_registry.get_available_actions(roles),
+			key=lambda action: action["action_name"]
+		)
+		tools = self._get_tool_definitions(actions)
+		
+		bundle = frappe._dict(
+			role_key=key,
+			actions=actions,
+			tools=tools,
+			tools_by_name={tool["function"]["name"]: tool for tool in tools},
+			system_prompt=self._build_system_prompt(roles)
+		)
+		
+		if len(self.prompt_bundles) >= PROMPT_CACHE_SIZE:
+			self.prompt_bundles.clear()
+		self.prompt_bundles[key] = bundle
+		
+		return bundle
+	
+	def _build_system_prompt(self, user_roles):
+		"""
+		Build the system prompt for the AI
+		The static rules form a stable prefix, the volatile role list comes last
+		"""
+		return f"""{SYSTEM_PROMPT}
 
-When a user asks about data, use the appropriate query function. When they want to create or modify something, use the appropriate action function. Always explain what you're going to do before calling a function that requires confirmation."""
+Current User Roles: {', '.join(user_roles)}"""
 	
-	def _get_session_history(self, session_id):
+	def _get_session_history(self, session_id, current_message=None):
 		"""
-		Get the conversation history from the session
+		Get the conversation history that fits the token budget
+		Older messages are represented by the session's rolling summary
 		"""
 		try:
-			session = frappe.get_doc("ERPAssist Chat Session", session_id)
-			history = []
-			
-			# Only include last 10 messages to avoid token limits
-			for msg in session.messages[-10:]:
-				history.append({
-					"role": msg.role,
-					"content": msg.message
-				})
+			history, pending = self.history_window.build(session_id, current_message)
+			
+			# Fold messages that left the window into the summary
+			if pending >= SUMMARY_BATCH:
+				enqueue_summary_update(session_id)
 			
 			return history
-		except:
+		except Exception:
+			frappe.log_error(frappe.get_traceback(), "ERPAssist History Error")
 			return []
 	
-	def _get_function_definitions(self, available_actions):
+	def _get_tool_definitions(self, available_actions):
 		"""
-		Convert available actions to OpenAI function definitions
+		Convert available actions to OpenAI tool definitions
 		"""
-		functions = []
+		tools = []
 		
 		for action in available_actions:
-			# Parse parameters if they exist
-			parameters = {"type": "object", "properties": {}, "required": []}
-			
-			if action.get("parameters"):
-				try:
-					param_def = json.loads(action["parameters"])
-					parameters = param_def
-				except:
-					pass
-			
-			functions.append({
-				"name": action["name"],
-				"description": action.get("description", ""),
-				"parameters": parameters
+			# Schemas are parsed once when the registry is compiled
+			parameters = action["parameter_schema"]
+			description = action.get("description") or ""
+			
+			tools.append({
+				"type": "function",
+				"function": {
+					"name": action["name"],
+					"description": f"{description} (Category: {action.get('action_category')}, Module: {action.get('module')})",
+					"parameters": parameters
+				}
 			})
 		
-		return functions if functions else None
+		return tools
 	
-	def _handle_function_call(self, function_call, user, session_id):
+	def _parse_tool_calls(self, tool_calls):
 		"""
-		Handle when AI wants to call a function
+		Turn model tool calls into calls with parsed arguments and registry actions
 		"""
-		function_name = function_call.name
+		calls = []
 		
-		try:
-			arguments = json.loads(function_call.arguments)
-		except:
-			arguments = {}
+		for tool_call in tool_calls:
+			raw_arguments = tool_call.function.arguments or "{}"
+			arguments_error = False
+			try:
+				arguments = json.loads(raw_arguments)
+			except:
+				arguments = {}
+				arguments_error = True
+			
+			if not isinstance(arguments, dict):
+				arguments = {}
+				arguments_error = True
+			
+			calls.append({
+				"id": tool_call.id,
+				"name": tool_call.function.name,
+				"arguments": arguments,
+				"arguments_error": arguments_error,
+				"raw_arguments": raw_arguments,
+				"action": self.action_registry.get_action(tool_call.function.name)
+			})
 		
-		# Get action details
-		action = self.action_registry.get_action(function_name)
+		return calls
+	
+	def _check_calls(self, calls):
+		"""
+		Return an error or confirmation response if any call cannot run directly
+		"""
+		for call in calls:
+			if not call["action"]:
+				return {
+					"message": f"Action '{call['name']}' is not available.",
+					"type": "error"
+				}
 		
-		if not action:
-			return {
-				"message": f"Action '{function_name}' is not available.",
-				"type": "error"
-			}
+		# Check if any action requires confirmation
+		for call in calls:
+			action = call["action"]
+			if action.get("requires_confirmation") or action.get("action_category") in ["POST", "EXECUTE_PAYROLL"]:
+				return {
+					"message": f"I need your confirmation to proceed with: {action.get('description', call['name'])}",
+					"type": "confirmation_required",
+					"action_name": call["name"],
+					"action_details": action,
+					"parameters": call["arguments"]
+				}
 		
-		# Check if action requires confirmation
-		if action.get("requires_confirmation") or action.get("action_category") in ["POST", "EXECUTE_PAYROLL"]:
-			return {
-				"message": f"I need your confirmation to proceed with: {action.get('description', function_name)}",
-				"type": "confirmation_required",
-				"action_name": function_name,
-				"action_details": action,
-				"parameters": arguments
+		return None
+	
+	def _execute_calls(self, calls, user, session_id, permissions=None):
+		"""
+		Execute actions, running QUERY actions concurrently on the action pool
+		Results are returned in the same order as calls, each with _elapsed_ms
+		"""
+		results = [None] * len(calls)
+		queries = [i for i, call in enumerate(calls) if call["action"].get("action_category") == "QUERY"]
+		
+		if len(queries) > 1:
+			site = frappe.local.site
+			sites_path = frappe.local.sites_path
+			futures = {
+				i: self.action_pool.submit(
+					_run_with_site_connection,
+					site, sites_path, user,
+					self._timed_execute_action, calls[i]["name"], calls[i]["arguments"], user, session_id, permissions
+				)
+				for i in queries
 			}
+		else:
+			futures = {}
+		
+		# Everything else runs on the request's own connection, in order
+		for i, call in enumerate(calls):
+			if i not in futures:
+				results[i] = self._timed_execute_action(call["name"], call["arguments"], user, session_id, permissions)
 		
-		# Execute action directly
-		return self.execute_action(function_name, arguments, user, session_id)
+		for i, future in futures.items():
+			results[i] = future.result()
+		
+		return results
+	
+	def _timed_execute_action(self, action_name, parameters, user, session_id=None, permissions=None):
+		started = time.monotonic()
+		result = dict(self.execute_action(action_name, parameters, user, session_id, permissions))
+		result["_elapsed_ms"] = _elapsed_ms(started)
+		return result
 	
-	def execute_action(self, action_name, parameters, user, session_id=None):
+	def execute_action(self, action_name, parameters, user, session_id=None, permissions=None):
 		"""
 		Execute an action with permission checks
+		permissions is the turn's PermissionContext, shared by every action of the turn
 		"""
 		try:
+			permissions = get_permission_context(user, permissions)
+			
 			# Get action
 			action = self.action_registry.get_action(action_name)
 			
@@ -205,28 +747,26 @@ When a user asks about data, use the appropriate query function. When they want
 				}
 			
 			# Check permissions
-			if not self.permission_guard.check_permission(user, action):
+			if not self.permission_guard.check_permission(user, action, permissions):
 				return {
 					"success": False,
 					"message": "You don't have permission to perform this action",
 					"error": "Permission denied"
 				}
 			
-			# Execute action
-			result = self.executor.execute(action, parameters, user)
+			# Execute action, sharing in-flight identical queries of the same user and permissions
+			if self.single_flight and action.get("action_category") == "QUERY":
+				result = self.single_flight.run(
+					f"action:{action_name}:{get_permission_scope(user, permissions)}:{hashlib.sha1(fingerprint(parameters).encode()).hexdigest()}",
+					lambda: self.executor.execute(action, parameters, user, permissions),
+					lock_ttl=30,
+					shareable=lambda result: result.get("success")
+				)
+			else:
+				result = self.executor.execute(action, parameters, user, permissions)
 			
 			# Log action
-			if self.settings.enable_audit_log:
-				AuditLogger.log_action(
-					user=user,
-					action_name=action_name,
-					action_category=action.get("action_category"),
-					status="Success" if result.get("success") else "Failed",
-					query=json.dumps(parameters),
-					result=json.dumps(result.get("data")),
-					error_message=result.get("error"),
-					session_id=session_id
-				)
+			self.log_action(user, action, parameters, result, session_id)
 			
 			return result
 			
@@ -237,3 +777,60 @@ When a user asks about data, use the appropriate query function. When they want
 				"message": f"Error executing action: {str(e)}",
 				"error": str(e)
 			}
+
+	def log_action(self, user, action, parameters, result, session_id=None):
+		"""
+		Write an audit log entry for an executed action, if audit logging is enabled
+		"""
+		if self.settings.enable_audit_log:
+			AuditLogger.log_action(
+				user=user,
+				action_name=action.get("action_name"),
+				action_category=action.get("action_category"),
+				status="Success" if result.get("success") else "Failed",
+				query=json.dumps(parameters),
+				result=json.dumps(result.get("data")),
+				error_message=result.get("error"),
+				session_id=session_id
+			)
+	
+	def _log_shared_turn(self, response, user, session_id):
+		"""
+		Audit the actions of a turn answered with another request's result
+		"""
+		for call, result in zip(response.get("calls") or [], response.get("results") or []):
+			action = self.action_registry.get_action(call["name"])
+			if action:
+				self.log_action(user, action, call["arguments"], result, session_id)
+
+def _elapsed_ms(started):
+	return round((time.monotonic() - started) * 1000, 1)
+
+def tool_result_content(result):
+	"""
+	Serialize an action result for the model, truncated to keep the context small
+	"""
+	content = frappe.as_json({
+		"success": result.get("success"),
+		"message": result.get("message"),
+		"data": result.get("data"),
+		"error": result.get("error")
+	}, indent=None)
+	
+	if len(content) > TOOL_RESULT_MAX_CHARS:
+		content = content[:TOOL_RESULT_MAX_CHARS] + "... [truncated]"
+	
+	return content
+
+def _run_with_site_connection(site, sites_path, user, fn, *args):
+	"""
+	Run fn in a worker thread with its own Frappe context and DB connection
+	"""
+	frappe.init(site=site, sites_path=sites_path)
+	
+	try:
+		frappe.connect()
+		frappe.set_user(user)
+		return fn(*args)
+	finally:
+		frappe.destroy()
@@ -0,0 +1,62 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import threading
+import frappe
+
+CONFIG_VERSION_KEY = "erpassist:config_version"
+
+# site -> (config version, AIOrchestrator)
+_pool = {}
+_pool_lock = threading.Lock()
+
+def get_orchestrator():
+	"""
+	Get the pooled AIOrchestrator for the current site
+
+	The orchestrator (settings, action registry and OpenAI client with its
+	keep-alive connection pool) is built once per worker and site, and rebuilt
+	only when the shared config version changes
+	"""
+	site = frappe.local.site
+	version = get_config_version()
+
+	entry = _pool.get(site)
+	if entry and entry[0] == version:
+		return entry[1]
+
+	with _pool_lock:
+		entry = _pool.get(site)
+		if entry and entry[0] == version:
+			return entry[1]
+
+		from erpassist.erpassist.core.orchestrator import AIOrchestrator
+		orchestrator = AIOrchestrator()
+		_pool[site] = (version, orchestrator)
+
+		return orchestrator
+
+def get_config_version():
+	"""
+	Get the config version shared by all workers of this site
+	"""
+	cache = frappe.cache()
+	version = cache.get_value(CONFIG_VERSION_KEY)
+
+	if not version:
+		version = frappe.generate_hash(length=12)
+		cache.set_value(CONFIG_VERSION_KEY, version)
+
+	return version
+
+def invalidate_pool(doc=None, method=None):
+	"""
+	Invalidate pooled orchestrators on all workers
+	Hooked to doc_events of ERPAssist Settings and ERPAssist Action Registry
+	"""
+	# Bump after commit so other workers never rebuild from uncommitted data
+	frappe.db.after_commit.add(_bump_config_version)
+
+def _bump_config_version():
+	frappe.cache().set_value(CONFIG_VERSION_KEY, frappe.generate_hash(length=12))
+	_pool.pop(frappe.local.site, None)
@@ -0,0 +1,68 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+
+class PermissionContext:
+	"""
+	Permission answers for one user within one chat turn
+	Roles, User Permissions and has_permission results are looked up once
+	and reused by the orchestrator, the permission guard and handlers
+	"""
+	
+	def __init__(self, user):
+		self.user = user
+		self._roles = None
+		self._user_permissions = None
+		self._answers = {}
+		
+		# doctype -> compiled SQL match conditions, see permission_query
+		self.match_conditions = {}
+		
+		# doctype -> readable fieldnames, see field_permissions
+		self.readable_fields = {}
+		
+		# doctypes -> permission scope key, see single_flight
+		self.scopes = {}
+	
+	@property
+	def roles(self):
+		if self._roles is None:
+			self._roles = frappe.get_roles(self.user)
+		
+		return self._roles
+	
+	@property
+	def user_permissions(self):
+		"""
+		The user's User Permission records, in a stable order
+		"""
+		if self._user_permissions is None:
+			self._user_permissions = frappe.get_all(
+				"User Permission",
+				filters={"user": self.user},
+				fields=["allow", "for_value", "applicable_for", "apply_to_all_doctypes"],
+				order_by="allow asc, for_value asc"
+			)
+		
+		return self._user_permissions
+	
+	def has_permission(self, doctype, ptype="read", doc=None):
+		"""
+		Memoized frappe.has_permission for this user
+		"""
+		key = (doctype, ptype, doc if isinstance(doc, str) or doc is None else doc.name)
+		
+		if key not in self._answers:
+			self._answers[key] = bool(frappe.has_permission(doctype, ptype, doc, user=self.user))
+		
+		return self._answers[key]
+
+def get_permission_context(user, permissions=None):
+	"""
+	Use the turn's context if there is one for this user, else a new one
+	"""
+	if permissions and permissions.user == user:
+		return permissions
+	
+	return PermissionContext(user)
@@ -2,18 +2,28 @@
 # For license information, please see license.txt
 
 import frappe
+from erpassist.erpassist.core.permission_query import get_permitted_list
+from erpassist.erpassist.core.field_permissions import get_readable_fields
 
 class PermissionGuard:
 	"""
 	Ensures all actions respect ERPNext permissions and user roles
 	"""
 	
-	def check_permission(self, user, action):
+	def __init__(self, action_registry=None):
+		# Registry role index for O(1) checks of registered actions
+		self.action_registry = action_registry
+	
+	def check_permission(self, user, action, permissions=None):
 		"""
 		Check if user has permission to execute an action
+		permissions is the turn's PermissionContext, if there is one
 		"""
 		# Get user roles
-		user_roles = frappe.get_roles(user)
+		user_roles = permissions.roles if permissions else frappe.get_roles(user)
+		
+		if self.action_registry and action.get("action_name") in self.action_registry.action_bits:
+			return self.action_registry.is_action_allowed(action["action_name"], user_roles)
 		
 		# Check if action has role restrictions
 		if not action.get("allowed_roles"):
@@ -21,7 +31,7 @@ class PermissionGuard:
 			return True
 		
 		# Check if user has any of the required roles
-		has_required_role = any(role in user_roles for role in action["allowed_roles"])
+		has_required_role = not set(user_roles).isdisjoint(action["allowed_roles"])
 		
 		return has_required_role
 	
@@ -44,29 +54,19 @@ class PermissionGuard:
 		if not self.check_doctype_permission(user, doctype, "read"):
 			return []
 		
-		# Use frappe.get_list which automatically applies permission filters
-		return frappe.get_list(
+		# Permission conditions are applied inside the query
+		return get_permitted_list(
 			doctype,
-			filters=filters or {},
-			user=user
+			user,
+			filters=filters or {}
 		)
 	
 	@staticmethod
-	def validate_field_permissions(user, doctype, fields):
+	def validate_field_permissions(user, doctype, fields, permissions=None):
 		"""
 		Validate that user can access requested fields
-		This is a basic implementation - can be extended based on needs
+		Uses the cached field map of the user's role set
 		"""
-		# Get meta for doctype
-		meta = frappe.get_meta(doctype)
-		
-		# Check each field
-		accessible_fields = []
-		for field in fields:
-			field_meta = meta.get_field(field)
-			if field_meta:
-				# Basic check - can be extended with more sophisticated logic
-				if not field_meta.permlevel or frappe.has_permission(doctype, "read", user=user):
-					accessible_fields.append(field)
+		readable = get_readable_fields(doctype, user, permissions)
 		
-		return accessible_fields
+		return [field for field in fields if field in readable]
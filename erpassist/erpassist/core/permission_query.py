@@ -0,0 +1,119 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.db_query import DatabaseQuery
+from erpassist.erpassist.core.permission_context import get_permission_context
+from erpassist.erpassist.core.single_flight import get_permission_scope
+
+MATCH_VERSION_KEY = "erpassist:permission_query:version"
+MATCH_CACHE_KEY = "erpassist:permission_query:conditions"
+
+# Shares and permission_query_conditions hooks are not part of the cache key,
+# so compiled conditions only live for a few minutes
+MATCH_CACHE_TTL = 5 * 60
+
+class PermittedQuery(DatabaseQuery):
+	"""
+	frappe.get_list query that takes its permission conditions from
+	get_match_conditions instead of building them on every call
+	"""
+	
+	def __init__(self, doctype, user, permissions=None):
+		super().__init__(doctype, user=user)
+		self.permissions = permissions
+	
+	def build_match_conditions(self, as_condition=True):
+		if not as_condition:
+			return super().build_match_conditions(as_condition)
+		
+		return get_match_conditions(self.doctype, self.user, self.permissions)
+
+def get_permitted_list(doctype, user, permissions=None, **kwargs):
+	"""
+	frappe.get_all for what the user may read: role permissions, User
+	Permissions and shares are applied inside the single query
+	Takes the arguments of frappe.get_all; fields the user may not read are
+	left out of the projection
+	"""
+	from erpassist.erpassist.core.field_permissions import project_readable_fields
+	
+	if kwargs.get("fields"):
+		kwargs["fields"] = project_readable_fields(doctype, kwargs["fields"], user, permissions)
+	
+	return PermittedQuery(doctype, user, permissions).execute(user=user, **kwargs)
+
+def get_permitted_count(doctype, user, filters=None, permissions=None):
+	"""
+	frappe.db.count for what the user may read
+	"""
+	rows = get_permitted_list(doctype, user, permissions, filters=filters, fields=["count(*) as count"])
+	return rows[0].count if rows else 0
+
+def get_match_conditions(doctype, user, permissions=None):
+	"""
+	Get the SQL condition that limits `tab{doctype}` to the rows the user may
+	read, "" if the user may read all of them. Compiled conditions are cached
+	per user, permission scope and doctype
+	Raises frappe.PermissionError if the user may not read the doctype at all
+	"""
+	permissions = get_permission_context(user, permissions)
+	
+	if doctype in permissions.match_conditions:
+		return permissions.match_conditions[doctype]
+	
+	if not (permissions.has_permission(doctype, "select") or permissions.has_permission(doctype, "read")):
+		raise frappe.PermissionError(doctype)
+	
+	cache_key = f"{MATCH_CACHE_KEY}:{get_match_version()}:{user}:{get_permission_scope(user, permissions)}:{doctype}"
+	conditions = frappe.cache().get_value(cache_key)
+	
+	if conditions is None:
+		conditions = DatabaseQuery(doctype, user=user).build_match_conditions() or ""
+		frappe.cache().set_value(cache_key, conditions, expires_in_sec=MATCH_CACHE_TTL)
+	
+	permissions.match_conditions[doctype] = conditions
+	return conditions
+
+def get_permission_clause(doctype, user, permissions=None, escape=True):
+	"""
+	get_match_conditions as an "AND (...)" clause for raw SQL, "" if unrestricted
+	The conditions name `tab{doctype}` in full, so the table must not be aliased
+	Pass escape=False for a query run without values: % is only doubled
+	where the driver interpolates values
+	"""
+	conditions = get_match_conditions(doctype, user, permissions)
+	
+	if not conditions:
+		return ""
+	
+	# LIKE patterns in User Permission or owner conditions would be taken
+	# for placeholders
+	if escape:
+		conditions = conditions.replace("%", "%%")
+	
+	return f"AND ({conditions})"
+
+def get_match_version():
+	"""
+	Get the permission rules version shared by all workers of this site
+	"""
+	cache = frappe.cache()
+	version = cache.get_value(MATCH_VERSION_KEY)
+	
+	if not version:
+		version = frappe.generate_hash(length=12)
+		cache.set_value(MATCH_VERSION_KEY, version)
+	
+	return version
+
+def invalidate_match_conditions(doc=None, method=None):
+	"""
+	Drop compiled conditions and field maps when permission rules or shares change
+	Hooked to doc_events of DocType, Custom DocPerm, Custom Field, Property
+	Setter and DocShare
+	"""
+	frappe.db.after_commit.add(_bump_match_version)
+
+def _bump_match_version():
+	frappe.cache().set_value(MATCH_VERSION_KEY, frappe.generate_hash(length=12))
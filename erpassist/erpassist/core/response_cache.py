@@ -0,0 +1,123 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+import hashlib
+import json
+from erpassist.erpassist.core.action_retriever import tokenize
+
+SELECTION_KEY = "erpassist:response_cache:selection"
+RESULT_KEY = "erpassist:response_cache:result"
+TURN_KEY = "erpassist:response_cache:turn"
+STATS_KEY = "erpassist:response_cache:stats"
+
+# Tool selections stay valid much longer than the data they return
+SELECTION_TTL = 24 * 60 * 60
+
+class ResponseCache:
+	"""
+	Cache for read-only (QUERY) turns
+	Stores the model's tool selection per normalized message and role set,
+	and handler results and the model's answer per user for a short TTL
+	"""
+	
+	def __init__(self, ttl=300):
+		self.ttl = ttl
+	
+	def get_selection(self, message, role_key):
+		"""
+		Get the cached tool selection for a message, or None
+		"""
+		selection = frappe.cache().get_value(self._selection_key(message, role_key))
+		self._count("hits" if selection else "misses")
+		return selection
+	
+	def set_selection(self, message, role_key, calls):
+		"""
+		Remember which actions (and arguments) answered a message
+		"""
+		frappe.cache().set_value(
+			self._selection_key(message, role_key),
+			{"calls": calls},
+			expires_in_sec=SELECTION_TTL
+		)
+	
+	def get_turn(self, message, role_key, user):
+		"""
+		Get the answer the model wrote for this user and the results it was
+		written from, still within the TTL, or None
+		"""
+		return frappe.cache().get_value(self._turn_key(message, role_key, user))
+	
+	def set_turn(self, message, role_key, user, answer, results):
+		frappe.cache().set_value(
+			self._turn_key(message, role_key, user),
+			{"answer": answer, "results": results},
+			expires_in_sec=self.ttl
+		)
+	
+	def get_result(self, action_name, arguments, user):
+		"""
+		Get a cached handler result still within the TTL, or None
+		"""
+		result = frappe.cache().get_value(self._result_key(action_name, arguments, user))
+		self._count("result_hits" if result else "result_misses")
+		return result
+	
+	def set_result(self, action_name, arguments, user, result):
+		frappe.cache().set_value(
+			self._result_key(action_name, arguments, user),
+			result,
+			expires_in_sec=self.ttl
+		)
+	
+	@staticmethod
+	def is_cacheable(action):
+		"""
+		Only read-only actions that have not opted out are cached
+		"""
+		return action.get("action_category") == "QUERY" and not action.get("disable_response_cache")
+	
+	@staticmethod
+	def get_stats():
+		"""
+		Get hit/miss counters for this site
+		"""
+		cache = frappe.cache()
+		stats = {}
+		
+		for counter in ["hits", "misses", "result_hits", "result_misses"]:
+			stats[counter] = int(cache.get(cache.make_key(f"{STATS_KEY}:{counter}")) or 0)
+		
+		lookups = stats["hits"] + stats["misses"]
+		stats["hit_rate"] = round(stats["hits"] / lookups * 100, 2) if lookups else 0
+		
+		return stats
+	
+	def _count(self, counter):
+		cache = frappe.cache()
+		cache.incr(cache.make_key(f"{STATS_KEY}:{counter}"))
+	
+	def _selection_key(self, message, role_key):
+		return f"{SELECTION_KEY}:{role_key}:{_hash(normalize_message(message))}"
+	
+	def _turn_key(self, message, role_key, user):
+		return f"{TURN_KEY}:{role_key}:{_hash(user + ':' + normalize_message(message))}"
+	
+	def _result_key(self, action_name, arguments, user):
+		return f"{RESULT_KEY}:{action_name}:{_hash(user + ':' + fingerprint(arguments))}"
+
+def normalize_message(message):
+	"""
+	Normalize a message so trivially different phrasings share a cache entry
+	"""
+	return " ".join(tokenize(message))
+
+def fingerprint(arguments):
+	"""
+	Stable fingerprint of action arguments
+	"""
+	return json.dumps(arguments or {}, sort_keys=True, default=str)
+
+def _hash(value):
+	return hashlib.sha1(value.encode()).hexdigest()
@@ -0,0 +1,137 @@
+# Copyright (c) 2025, Your Company and contributors
+# For license information, please see license.txt
+
+import frappe
+import hashlib
+import json
+import time
+from erpassist.erpassist.core.permission_context import get_permission_context
+
+LOCK_KEY = "erpassist:single_flight:lock"
+RESULT_KEY = "erpassist:single_flight:result"
+STATS_KEY = "erpassist:single_flight:stats"
+
+# How often a waiting request checks for the leader's result
+POLL_INTERVAL = 0.05
+
+class SingleFlight:
+	"""
+	Coalesces identical concurrent requests across workers
+	The first request for a key takes a Redis lock and computes the result,
+	identical requests arriving meanwhile wait for it and share the result
+	"""
+	
+	def __init__(self, result_ttl=5):
+		# Late arrivals within result_ttl of the leader finishing also share its result
+		self.result_ttl = result_ttl
+	
+	def run(self, key, fn, lock_ttl=60, shareable=None):
+		"""
+		Return fn() for key, computed once by whichever request gets there first
+		lock_ttl bounds how long waiters wait for a leader that never finishes
+		shareable(result) decides whether waiters may use the leader's result,
+		otherwise they compute their own
+		"""
+		cache = frappe.cache()
+		lock_key = cache.make_key(f"{LOCK_KEY}:{key}")
+		result_key = f"{RESULT_KEY}:{key}"
+		
+		# expires=True skips Frappe's per-request cache, which would keep
+		# returning the first miss
+		shared = cache.get_value(result_key, expires=True)
+		if shared:
+			self._count("shared")
+			return shared["value"]
+		
+		token = frappe.generate_hash(length=12)
+		if cache.set(lock_key, token, nx=True, ex=lock_ttl):
+			return self._lead(lock_key, result_key, token, fn, shareable)
+		
+		self._count("waited")
+		deadline = time.monotonic() + lock_ttl
+		
+		while time.monotonic() < deadline:
+			time.sleep(POLL_INTERVAL)
+			
+			shared = cache.get_value(result_key, expires=True)
+			if shared:
+				self._count("shared")
+				return shared["value"]
+			
+			# The leader failed or its result may not be shared
+			if not cache.get(lock_key):
+				break
+		
+		self._count("fallback")
+		return fn()
+	
+	def _lead(self, lock_key, result_key, token, fn, shareable):
+		cache = frappe.cache()
+		self._count("led")
+		
+		try:
+			result = fn()
+			
+			if shareable is None or shareable(result):
+				cache.set_value(result_key, {"value": result}, expires_in_sec=self.result_ttl)
+			
+			return result
+		
+		finally:
+			# Only release the lock if it has not expired and been taken over
+			if cache.get(lock_key) == token.encode():
+				cache.delete(lock_key)
+	
+	def _count(self, counter):
+		cache = frappe.cache()
+		cache.incr(cache.make_key(f"{STATS_KEY}:{counter}"))
+	
+	@staticmethod
+	def get_stats():
+		"""
+		Get counters for this site: requests that led, waited, shared a
+		result or fell back to computing their own
+		"""
+		cache = frappe.cache()
+		
+		return {
+			counter: int(cache.get(cache.make_key(f"{STATS_KEY}:{counter}")) or 0)
+			for counter in ["led", "waited", "shared", "fallback"]
+		}
+
+def get_permission_scope(user, permissions=None, doctypes=None):
+	"""
+	Key for what a user is allowed to see: their role set and User Permission
+	restrictions, so users with the same permissions share a scope
+	Owner-only permissions and shared documents make what a user sees their
+	own; if either applies to doctypes (any doctype if not given) the user
+	is part of the key
+	"""
+	permissions = get_permission_context(user, permissions)
+	doctypes = tuple(sorted(doctypes)) if doctypes else None
+	
+	if doctypes not in permissions.scopes:
+		scope = [sorted(set(permissions.roles)), permissions.user_permissions]
+		
+		if _has_personal_access(user, permissions.roles, doctypes):
+			scope.append(user)
+		
+		permissions.scopes[doctypes] = hashlib.sha1(
+			json.dumps(scope, sort_keys=True, default=str).encode()
+		).hexdigest()[:16]
+	
+	return permissions.scopes[doctypes]
+
+def _has_personal_access(user, roles, doctypes=None):
+	"""
+	Check if the role set has owner-only permissions or the user has
+	documents shared with them
+	"""
+	doctype_filter = {"parent": ["in", doctypes]} if doctypes else {}
+	
+	for perm_doctype in ["Custom DocPerm", "DocPerm"]:
+		if frappe.get_all(perm_doctype, filters={"role": ["in", roles], "if_owner": 1, **doctype_filter}, limit=1):
+			return True
+	
+	share_filter = {"share_doctype": ["in", doctypes]} if doctypes else {}
+	return bool(frappe.get_all("DocShare", filters={"user": user, "read": 1, **share_filter}, limit=1))
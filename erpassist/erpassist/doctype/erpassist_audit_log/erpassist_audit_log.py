@@ -6,3 +6,11 @@ from frappe.model.document import Document
 
 class ERPAssistAuditLog(Document):
 	pass
+
+def on_doctype_update():
+	# Activity and history lookups filter on one column and sort by timestamp;
+	# archival scans by timestamp and checks which blobs are still referenced
+	frappe.db.add_index("ERPAssist Audit Log", ["user", "timestamp"])
+	frappe.db.add_index("ERPAssist Audit Log", ["action_name", "timestamp"])
+	frappe.db.add_index("ERPAssist Audit Log", ["timestamp"])
+	frappe.db.add_index("ERPAssist Audit Log", ["result_blob"])
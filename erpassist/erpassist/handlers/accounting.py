@@ -3,8 +3,9 @@
 
 import frappe
 from frappe import _
+from erpassist.erpassist.core.permission_query import get_permitted_list, get_permission_clause
 
-def get_account_balances(parameters, user):
+def get_account_balances(parameters, user, permissions=None):
 	"""
 	Get account balances
 	"""
@@ -22,8 +23,10 @@ def get_account_balances(parameters, user):
 			filters["root_type"] = parameters["root_type"]
 		
 		# Get accounts
-		accounts = frappe.get_all(
+		accounts = get_permitted_list(
 			"Account",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "account_name", "account_type", "root_type",
@@ -33,15 +36,18 @@ def get_account_balances(parameters, user):
 		)
 		
 		# Get GL entries to calculate balances
+		permission_clause = get_permission_clause("GL Entry", user, permissions)
+		
 		for account in accounts:
 			if not account.get("is_group"):
 				# Get balance from GL Entry
-				balance = frappe.db.sql("""
+				balance = frappe.db.sql(f"""
 					SELECT 
 						SUM(debit) - SUM(credit) as balance
 					FROM `tabGL Entry`
 					WHERE account = %s
 					AND is_cancelled = 0
+					{permission_clause}
 				""", account["name"], as_dict=True)
 				
 				account["balance"] = balance[0]["balance"] if balance else 0
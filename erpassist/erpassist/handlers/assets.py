@@ -3,8 +3,9 @@
 
 import frappe
 from frappe import _
+from erpassist.erpassist.core.permission_query import get_permitted_list
 
-def get_assets_summary(parameters, user):
+def get_assets_summary(parameters, user, permissions=None):
 	"""
 	Get assets summary
 	"""
@@ -22,8 +23,10 @@ def get_assets_summary(parameters, user):
 			filters["location"] = parameters["location"]
 		
 		# Get assets
-		assets = frappe.get_all(
+		assets = get_permitted_list(
 			"Asset",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "asset_name", "asset_category", "status", "location",
@@ -64,25 +67,32 @@ def get_assets_summary(parameters, user):
 			"error": str(e)
 		}
 
-def get_asset_maintenance_schedule(parameters, user):
+def get_asset_maintenance_schedule(parameters, user, permissions=None):
 	"""
 	Get asset maintenance schedule
 	"""
 	try:
-		filters = {}
+		# Tasks are a child table, read through the Asset Maintenance the user may read
+		filters = [["Asset Maintenance Task", "name", "is", "set"]]
 		
 		if parameters.get("asset"):
-			filters["asset_name"] = parameters["asset"]
+			filters.append(["Asset Maintenance", "asset_name", "=", parameters["asset"]])
 		
 		# Get maintenance schedule
-		schedules = frappe.get_all(
-			"Asset Maintenance Task",
+		schedules = get_permitted_list(
+			"Asset Maintenance",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
-				"name", "asset_name", "maintenance_type", "next_due_date",
-				"maintenance_status", "periodicity", "assign_to"
+				"`tabAsset Maintenance Task`.name", "asset_name",
+				"`tabAsset Maintenance Task`.maintenance_type",
+				"`tabAsset Maintenance Task`.next_due_date",
+				"`tabAsset Maintenance Task`.maintenance_status",
+				"`tabAsset Maintenance Task`.periodicity",
+				"`tabAsset Maintenance Task`.assign_to"
 			],
-			order_by="next_due_date",
+			order_by="`tabAsset Maintenance Task`.next_due_date",
 			limit=100
 		)
 		
@@ -3,8 +3,9 @@
 
 import frappe
 from frappe import _
+from erpassist.erpassist.core.permission_query import get_permitted_list
 
-def get_purchase_orders(parameters, user):
+def get_purchase_orders(parameters, user, permissions=None):
 	"""
 	Get purchase orders
 	"""
@@ -27,8 +28,10 @@ def get_purchase_orders(parameters, user):
 			filters["supplier"] = parameters["supplier"]
 		
 		# Get purchase orders
-		purchase_orders = frappe.get_all(
+		purchase_orders = get_permitted_list(
 			"Purchase Order",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "supplier", "transaction_date", "schedule_date",
@@ -4,8 +4,9 @@
 import frappe
 from frappe import _
 from frappe.utils import flt, getdate, add_days
+from erpassist.erpassist.core.permission_query import get_permitted_list, get_permitted_count, get_permission_clause
 
-def get_leads_summary(parameters, user):
+def get_leads_summary(parameters, user, permissions=None):
 	"""
 	Get summary of leads with statistics
 	"""
@@ -29,9 +30,11 @@ def get_leads_summary(parameters, user):
 		if parameters.get("source"):
 			filters["source"] = parameters["source"]
 		
-		# Get leads
-		leads = frappe.get_all(
+		# Get leads the user may read
+		leads = get_permitted_list(
 			"Lead",
+			user,
+			permissions,
 			filters=filters,
 			fields=["name", "lead_name", "email_id", "mobile_no", "status", "source", "creation", "lead_owner", "company"],
 			order_by="creation desc",
@@ -160,7 +163,7 @@ def convert_lead_to_customer(parameters, user):
 			"error": str(e)
 		}
 
-def get_lead_conversion_rate(parameters, user):
+def get_lead_conversion_rate(parameters, user, permissions=None):
 	"""
 	Get lead conversion statistics
 	"""
@@ -169,23 +172,26 @@ def get_lead_conversion_rate(parameters, user):
 		to_date = parameters.get("to_date", getdate())
 		
 		# Get total leads
-		total_leads = frappe.db.count("Lead", {
+		total_leads = get_permitted_count("Lead", user, {
 			"creation": ["between", [from_date, to_date]]
-		})
+		}, permissions)
 		
 		# Get converted leads
-		converted_leads = frappe.db.count("Lead", {
+		converted_leads = get_permitted_count("Lead", user, {
 			"creation": ["between", [from_date, to_date]],
 			"status": "Converted"
-		})
+		}, permissions)
 		
 		conversion_rate = (converted_leads / total_leads * 100) if total_leads > 0 else 0
 		
-		# Get leads by status
-		status_data = frappe.db.sql("""
+		# Get leads by status the user may read
+		permission_clause = get_permission_clause("Lead", user, permissions)
+		
+		status_data = frappe.db.sql(f"""
 			SELECT status, COUNT(*) as count
 			FROM `tabLead`
 			WHERE creation BETWEEN %s AND %s
+			{permission_clause}
 			GROUP BY status
 		""", (from_date, to_date), as_dict=True)
 		
@@ -211,7 +217,7 @@ def get_lead_conversion_rate(parameters, user):
 			"error": str(e)
 		}
 
-def get_opportunities(parameters, user):
+def get_opportunities(parameters, user, permissions=None):
 	"""
 	Get opportunities with detailed analytics
 	"""
@@ -234,8 +240,10 @@ def get_opportunities(parameters, user):
 			filters["opportunity_type"] = parameters["opportunity_type"]
 		
 		# Get opportunities
-		opportunities = frappe.get_all(
+		opportunities = get_permitted_list(
 			"Opportunity",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "opportunity_from", "party_name", "opportunity_amount",
@@ -326,7 +334,7 @@ def create_opportunity_draft(parameters, user):
 			"error": str(e)
 		}
 
-def get_opportunity_pipeline(parameters, user):
+def get_opportunity_pipeline(parameters, user, permissions=None):
 	"""
 	Get opportunity pipeline by stage
 	"""
@@ -334,8 +342,10 @@ def get_opportunity_pipeline(parameters, user):
 		from_date = parameters.get("from_date", add_days(getdate(), -90))
 		to_date = parameters.get("to_date", getdate())
 		
-		# Get opportunities by status
-		pipeline = frappe.db.sql("""
+		# Get opportunities by status the user may read
+		permission_clause = get_permission_clause("Opportunity", user, permissions)
+		
+		pipeline = frappe.db.sql(f"""
 			SELECT 
 				status,
 				COUNT(*) as count,
@@ -344,6 +354,7 @@ def get_opportunity_pipeline(parameters, user):
 				SUM(opportunity_amount * probability / 100) as weighted_amount
 			FROM `tabOpportunity`
 			WHERE expected_closing BETWEEN %s AND %s
+			{permission_clause}
 			GROUP BY status
 			ORDER BY 
 				CASE status
@@ -379,7 +390,7 @@ def get_opportunity_pipeline(parameters, user):
 			"error": str(e)
 		}
 
-def get_customer_summary(parameters, user):
+def get_customer_summary(parameters, user, permissions=None):
 	"""
 	Get customer summary and analytics
 	"""
@@ -396,8 +407,10 @@ def get_customer_summary(parameters, user):
 			filters["disabled"] = parameters["disabled"]
 		
 		# Get customers
-		customers = frappe.get_all(
+		customers = get_permitted_list(
 			"Customer",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "customer_name", "customer_group", "territory",
@@ -407,15 +420,18 @@ def get_customer_summary(parameters, user):
 			limit=100
 		)
 		
-		# Get revenue data for each customer
+		# Get revenue data for each customer, from invoices the user may read
+		permission_clause = get_permission_clause("Sales Invoice", user, permissions)
+		
 		for customer in customers:
-			revenue = frappe.db.sql("""
+			revenue = frappe.db.sql(f"""
 				SELECT 
 					SUM(grand_total) as total_revenue,
 					COUNT(*) as order_count
 				FROM `tabSales Invoice`
 				WHERE customer = %s
 				AND docstatus = 1
+				{permission_clause}
 			""", customer["name"], as_dict=True)
 			
 			if revenue:
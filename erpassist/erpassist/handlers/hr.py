@@ -3,8 +3,10 @@
 
 import frappe
 from frappe import _
+from erpassist.erpassist.core.permission_query import get_permitted_list
+from erpassist.erpassist.core.permission_context import get_permission_context
 
-def get_employee_list(parameters, user):
+def get_employee_list(parameters, user, permissions=None):
 	"""
 	Get employee list
 	"""
@@ -22,8 +24,10 @@ def get_employee_list(parameters, user):
 			filters["designation"] = parameters["designation"]
 		
 		# Get employees
-		employees = frappe.get_all(
+		employees = get_permitted_list(
 			"Employee",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "employee_name", "department", "designation",
@@ -52,7 +56,7 @@ def get_employee_list(parameters, user):
 			"error": str(e)
 		}
 
-def approve_leave(parameters, user):
+def approve_leave(parameters, user, permissions=None):
 	"""
 	Approve a leave application
 	"""
@@ -69,7 +73,7 @@ def approve_leave(parameters, user):
 		leave_app = frappe.get_doc("Leave Application", parameters["leave_application"])
 		
 		# Check if user has permission to approve
-		if not frappe.has_permission("Leave Application", "write", leave_app.name, user=user):
+		if not get_permission_context(user, permissions).has_permission("Leave Application", "write", leave_app.name):
 			return {
 				"success": False,
 				"message": "You don't have permission to approve this leave application",
@@ -3,8 +3,9 @@
 
 import frappe
 from frappe import _
+from erpassist.erpassist.core.permission_query import get_permitted_list
 
-def get_maintenance_schedule(parameters, user):
+def get_maintenance_schedule(parameters, user, permissions=None):
 	"""
 	Get maintenance schedule
 	"""
@@ -16,8 +17,10 @@ def get_maintenance_schedule(parameters, user):
 			filters["customer"] = parameters["customer"]
 		
 		# Get maintenance schedules
-		schedules = frappe.get_all(
+		schedules = get_permitted_list(
 			"Maintenance Schedule",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "customer", "transaction_date", "status"
@@ -45,7 +48,7 @@ def get_maintenance_schedule(parameters, user):
 			"error": str(e)
 		}
 
-def get_maintenance_visits(parameters, user):
+def get_maintenance_visits(parameters, user, permissions=None):
 	"""
 	Get maintenance visits
 	"""
@@ -60,8 +63,10 @@ def get_maintenance_visits(parameters, user):
 			filters["customer"] = parameters["customer"]
 		
 		# Get maintenance visits
-		visits = frappe.get_all(
+		visits = get_permitted_list(
 			"Maintenance Visit",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "customer", "customer_name", "mntc_date", 
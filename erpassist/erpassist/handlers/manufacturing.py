@@ -3,8 +3,9 @@
 
 import frappe
 from frappe import _
+from erpassist.erpassist.core.permission_query import get_permitted_list
 
-def get_work_orders(parameters, user):
+def get_work_orders(parameters, user, permissions=None):
 	"""
 	Get work orders
 	"""
@@ -22,8 +23,10 @@ def get_work_orders(parameters, user):
 			filters["planned_start_date"] = [">=", parameters["from_date"]]
 		
 		# Get work orders
-		work_orders = frappe.get_all(
+		work_orders = get_permitted_list(
 			"Work Order",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "production_item", "item_name", "qty", "produced_qty",
@@ -52,7 +55,7 @@ def get_work_orders(parameters, user):
 			"error": str(e)
 		}
 
-def get_bom_summary(parameters, user):
+def get_bom_summary(parameters, user, permissions=None):
 	"""
 	Get Bill of Materials summary
 	"""
@@ -70,8 +73,10 @@ def get_bom_summary(parameters, user):
 			filters["is_default"] = 1
 		
 		# Get BOMs
-		boms = frappe.get_all(
+		boms = get_permitted_list(
 			"BOM",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "item", "item_name", "quantity", "is_active",
@@ -3,8 +3,9 @@
 
 import frappe
 from frappe import _
+from erpassist.erpassist.core.permission_context import get_permission_context
 
-def execute_payroll(parameters, user):
+def execute_payroll(parameters, user, permissions=None):
 	"""
 	Execute payroll for a period
 	This is a critical operation and should be done with care
@@ -22,7 +23,7 @@ def execute_payroll(parameters, user):
 		payroll = frappe.get_doc("Payroll Entry", parameters["payroll_entry"])
 		
 		# Check if user has permission
-		if not frappe.has_permission("Payroll Entry", "write", payroll.name, user=user):
+		if not get_permission_context(user, permissions).has_permission("Payroll Entry", "write", payroll.name):
 			return {
 				"success": False,
 				"message": "You don't have permission to execute this payroll",
@@ -3,8 +3,9 @@
 
 import frappe
 from frappe import _
+from erpassist.erpassist.core.permission_query import get_permitted_list
 
-def get_projects_summary(parameters, user):
+def get_projects_summary(parameters, user, permissions=None):
 	"""
 	Get projects summary
 	"""
@@ -19,8 +20,10 @@ def get_projects_summary(parameters, user):
 			filters["project_type"] = parameters["project_type"]
 		
 		# Get projects
-		projects = frappe.get_all(
+		projects = get_permitted_list(
 			"Project",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "project_name", "status", "project_type", 
@@ -59,7 +62,7 @@ def get_projects_summary(parameters, user):
 			"error": str(e)
 		}
 
-def get_tasks_summary(parameters, user):
+def get_tasks_summary(parameters, user, permissions=None):
 	"""
 	Get tasks summary
 	"""
@@ -77,8 +80,10 @@ def get_tasks_summary(parameters, user):
 			filters["_assign"] = ["like", f"%{parameters['assigned_to']}%"]
 		
 		# Get tasks
-		tasks = frappe.get_all(
+		tasks = get_permitted_list(
 			"Task",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "subject", "status", "priority", "project",
@@ -3,8 +3,9 @@
 
 import frappe
 from frappe import _
+from erpassist.erpassist.core.permission_query import get_permitted_list
 
-def get_quality_inspections(parameters, user):
+def get_quality_inspections(parameters, user, permissions=None):
 	"""
 	Get quality inspections
 	"""
@@ -22,8 +23,10 @@ def get_quality_inspections(parameters, user):
 			filters["item_code"] = parameters["item_code"]
 		
 		# Get inspections
-		inspections = frappe.get_all(
+		inspections = get_permitted_list(
 			"Quality Inspection",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "item_code", "item_name", "inspection_type", "status",
@@ -61,7 +64,7 @@ def get_quality_inspections(parameters, user):
 			"error": str(e)
 		}
 
-def get_quality_goals(parameters, user):
+def get_quality_goals(parameters, user, permissions=None):
 	"""
 	Get quality goals
 	"""
@@ -69,8 +72,10 @@ def get_quality_goals(parameters, user):
 		filters = {}
 		
 		# Get quality goals
-		goals = frappe.get_all(
+		goals = get_permitted_list(
 			"Quality Goal",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "goal", "target", "frequency", "revision"
@@ -4,8 +4,9 @@
 import frappe
 from frappe import _
 from frappe.utils import flt, getdate, add_days, nowdate
+from erpassist.erpassist.core.permission_query import get_permitted_list, get_permission_clause
 
-def get_sales_orders(parameters, user):
+def get_sales_orders(parameters, user, permissions=None):
 	"""
 	Get sales orders with detailed analytics
 	"""
@@ -28,8 +29,10 @@ def get_sales_orders(parameters, user):
 			filters["customer"] = parameters["customer"]
 		
 		# Get sales orders
-		sales_orders = frappe.get_all(
+		sales_orders = get_permitted_list(
 			"Sales Order",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "customer", "customer_name", "transaction_date", "delivery_date",
@@ -68,13 +71,15 @@ def get_sales_orders(parameters, user):
 			"error": str(e)
 		}
 
-def get_pending_sales_orders(parameters, user):
+def get_pending_sales_orders(parameters, user, permissions=None):
 	"""
 	Get pending/outstanding sales orders
 	"""
 	try:
 		# Get sales orders that are not fully delivered or billed
-		pending_orders = frappe.db.sql("""
+		permission_clause = get_permission_clause("Sales Order", user, permissions, escape=False)
+		
+		pending_orders = frappe.db.sql(f"""
 			SELECT 
 				name, customer, customer_name, transaction_date, delivery_date,
 				grand_total, status, per_delivered, per_billed,
@@ -83,6 +88,7 @@ def get_pending_sales_orders(parameters, user):
 			WHERE docstatus = 1
 			AND status NOT IN ('Completed', 'Closed', 'Cancelled')
 			AND (per_delivered < 100 OR per_billed < 100)
+			{permission_clause}
 			ORDER BY delivery_date ASC
 			LIMIT 100
 		""", as_dict=True)
@@ -113,7 +119,7 @@ def get_pending_sales_orders(parameters, user):
 			"error": str(e)
 		}
 
-def get_quotations_summary(parameters, user):
+def get_quotations_summary(parameters, user, permissions=None):
 	"""
 	Get quotations summary with conversion tracking
 	"""
@@ -132,8 +138,10 @@ def get_quotations_summary(parameters, user):
 			filters["status"] = parameters["status"]
 		
 		# Get quotations
-		quotations = frappe.get_all(
+		quotations = get_permitted_list(
 			"Quotation",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "party_name", "transaction_date", "valid_till",
@@ -172,7 +180,7 @@ def get_quotations_summary(parameters, user):
 			"error": str(e)
 		}
 
-def get_sales_analytics(parameters, user):
+def get_sales_analytics(parameters, user, permissions=None):
 	"""
 	Get comprehensive sales analytics
 	"""
@@ -180,8 +188,11 @@ def get_sales_analytics(parameters, user):
 		from_date = parameters.get("from_date", add_days(nowdate(), -30))
 		to_date = parameters.get("to_date", nowdate())
 		
+		# Only sales orders the user may read are counted
+		permission_clause = get_permission_clause("Sales Order", user, permissions)
+		
 		# Sales by customer
-		sales_by_customer = frappe.db.sql("""
+		sales_by_customer = frappe.db.sql(f"""
 			SELECT 
 				customer,
 				customer_name,
@@ -190,29 +201,31 @@ def get_sales_analytics(parameters, user):
 			FROM `tabSales Order`
 			WHERE docstatus = 1
 			AND transaction_date BETWEEN %s AND %s
+			{permission_clause}
 			GROUP BY customer
 			ORDER BY total_sales DESC
 			LIMIT 10
 		""", (from_date, to_date), as_dict=True)
 		
 		# Sales by item group
-		sales_by_item = frappe.db.sql("""
+		sales_by_item = frappe.db.sql(f"""
 			SELECT 
 				i.item_group,
 				SUM(soi.amount) as total_amount,
 				SUM(soi.qty) as total_qty
 			FROM `tabSales Order Item` soi
-			INNER JOIN `tabSales Order` so ON soi.parent = so.name
+			INNER JOIN `tabSales Order` ON soi.parent = `tabSales Order`.name
 			INNER JOIN `tabItem` i ON soi.item_code = i.name
-			WHERE so.docstatus = 1
-			AND so.transaction_date BETWEEN %s AND %s
+			WHERE `tabSales Order`.docstatus = 1
+			AND `tabSales Order`.transaction_date BETWEEN %s AND %s
+			{permission_clause}
 			GROUP BY i.item_group
 			ORDER BY total_amount DESC
 			LIMIT 10
 		""", (from_date, to_date), as_dict=True)
 		
 		# Monthly trend
-		monthly_trend = frappe.db.sql("""
+		monthly_trend = frappe.db.sql(f"""
 			SELECT 
 				DATE_FORMAT(transaction_date, '%%Y-%%m') as month,
 				COUNT(*) as order_count,
@@ -220,6 +233,7 @@ def get_sales_analytics(parameters, user):
 			FROM `tabSales Order`
 			WHERE docstatus = 1
 			AND transaction_date BETWEEN %s AND %s
+			{permission_clause}
 			GROUP BY month
 			ORDER BY month
 		""", (from_date, to_date), as_dict=True)
@@ -3,8 +3,9 @@
 
 import frappe
 from frappe import _
+from erpassist.erpassist.core.permission_query import get_permitted_list
 
-def get_stock_summary(parameters, user):
+def get_stock_summary(parameters, user, permissions=None):
 	"""
 	Get stock levels and summary
 	"""
@@ -22,8 +23,10 @@ def get_stock_summary(parameters, user):
 			filters["item_group"] = parameters["item_group"]
 		
 		# Get stock balances
-		stock_balances = frappe.get_all(
+		stock_balances = get_permitted_list(
 			"Bin",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"item_code", "warehouse", "actual_qty", "reserved_qty",
@@ -3,8 +3,9 @@
 
 import frappe
 from frappe import _
+from erpassist.erpassist.core.permission_query import get_permitted_list, get_permission_clause
 
-def get_issues_summary(parameters, user):
+def get_issues_summary(parameters, user, permissions=None):
 	"""
 	Get support issues summary
 	"""
@@ -21,9 +22,14 @@ def get_issues_summary(parameters, user):
 		if parameters.get("customer"):
 			filters["customer"] = parameters["customer"]
 		
+		if parameters.get("assigned_to"):
+			filters["_assign"] = ["like", f"%{parameters['assigned_to']}%"]
+		
 		# Get issues
-		issues = frappe.get_all(
+		issues = get_permitted_list(
 			"Issue",
+			user,
+			permissions,
 			filters=filters,
 			fields=[
 				"name", "subject", "customer", "status", "priority",
@@ -65,24 +71,27 @@ def get_issues_summary(parameters, user):
 			"error": str(e)
 		}
 
-def get_service_level_summary(parameters, user):
+def get_service_level_summary(parameters, user, permissions=None):
 	"""
 	Get service level agreement summary
 	"""
 	try:
 		filters = {}
 		
-		# Get SLA data
-		sla_compliance = frappe.db.sql("""
+		# Get SLA data of the issues the user may read
+		permission_clause = get_permission_clause("Issue", user, permissions, escape=False)
+		
+		sla_compliance = frappe.db.sql(f"""
 			SELECT 
-				i.priority,
+				priority,
 				COUNT(*) as total,
-				SUM(CASE WHEN i.resolution_date IS NOT NULL 
-					AND i.resolution_date <= i.response_by THEN 1 ELSE 0 END) as met_sla,
-				AVG(TIMESTAMPDIFF(HOUR, i.opening_date, i.resolution_date)) as avg_resolution_hours
-			FROM `tabIssue` i
-			WHERE i.status != 'Open'
-			GROUP BY i.priority
+				SUM(CASE WHEN resolution_date IS NOT NULL 
+					AND resolution_date <= response_by THEN 1 ELSE 0 END) as met_sla,
+				AVG(TIMESTAMPDIFF(HOUR, opening_date, resolution_date)) as avg_resolution_hours
+			FROM `tabIssue`
+			WHERE status != 'Open'
+			{permission_clause}
+			GROUP BY priority
 		""", as_dict=True)
 		
 		return {
@@ -46,6 +46,7 @@ app_include_js = "/assets/erpassist/js/erpassist.bundle.js"
 
 # before_install = "erpassist.install.before_install"
 after_install = "erpassist.install.after_install"
+after_migrate = "erpassist.erpassist.core.action_sync.after_migrate"
 
 # Uninstallation
 # ------------
@@ -91,9 +92,61 @@ after_install = "erpassist.install.after_install"
 #	}
 # }
 
+doc_events = {
+	"ERPAssist Settings": {
+		"on_update": "erpassist.erpassist.core.orchestrator_pool.invalidate_pool"
+	},
+	"ERPAssist Action Registry": {
+		"on_update": [
+			"erpassist.erpassist.core.action_registry.invalidate_registry",
+			"erpassist.erpassist.core.orchestrator_pool.invalidate_pool"
+		],
+		"on_trash": [
+			"erpassist.erpassist.core.action_registry.invalidate_registry",
+			"erpassist.erpassist.core.orchestrator_pool.invalidate_pool"
+		]
+	},
+	"DocType": {
+		"on_update": "erpassist.erpassist.core.permission_query.invalidate_match_conditions"
+	},
+	"Custom DocPerm": {
+		"on_update": "erpassist.erpassist.core.permission_query.invalidate_match_conditions",
+		"on_trash": "erpassist.erpassist.core.permission_query.invalidate_match_conditions"
+	},
+	"Custom Field": {
+		"on_update": "erpassist.erpassist.core.permission_query.invalidate_match_conditions",
+		"on_trash": "erpassist.erpassist.core.permission_query.invalidate_match_conditions"
+	},
+	"Property Setter": {
+		"on_update": "erpassist.erpassist.core.permission_query.invalidate_match_conditions",
+		"on_trash": "erpassist.erpassist.core.permission_query.invalidate_match_conditions"
+	},
+	"DocShare": {
+		"on_update": "erpassist.erpassist.core.permission_query.invalidate_match_conditions",
+		"on_trash": "erpassist.erpassist.core.permission_query.invalidate_match_conditions"
+	}
+}
+
 # Scheduled Tasks
 # ---------------
 
+scheduler_events = {
+	"daily": [
+		"erpassist.erpassist.core.batch_runner.run_scheduled_prompts"
+	],
+	"daily_long": [
+		"erpassist.erpassist.core.audit_archive.archive_audit_log"
+	],
+	"cron": {
+		"* * * * *": [
+			"erpassist.erpassist.core.audit_logger.flush_audit_log"
+		],
+		"*/5 * * * *": [
+			"erpassist.erpassist.core.batch_runner.poll_batch_runs"
+		]
+	}
+}
+
 # scheduler_events = {
 #	"all": [
 #		"erpassist.tasks.all"
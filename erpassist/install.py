@@ -2,7 +2,7 @@
 # For license information, please see license.txt
 
 import frappe
-from erpassist.erpassist.core.action_registry import ActionRegistry
+from erpassist.erpassist.core.action_sync import sync_actions
 
 def after_install():
 	"""
@@ -13,9 +13,7 @@ def after_install():
 		create_default_settings()
 		
 		# Register default actions
-		ActionRegistry.register_default_actions()
-		
-		frappe.db.commit()
+		sync_actions(verbose=True)
 		
 		print("=" * 60)
 		print("ERPAssist installation complete!")
@@ -9,6 +9,9 @@ erpassist.ChatPanel = class ChatPanel {
 	constructor() {
 		this.session_id = null;
 		this.messages = [];
+		this.streams = {};
+		this.turns = {};
+		this.finished_turns = {};
 		this.is_open = false;
 		this.init();
 	}
@@ -87,6 +90,18 @@ erpassist.ChatPanel = class ChatPanel {
 				this.send_message();
 			}
 		});
+
+		// Streamed reply tokens
+		if (frappe.realtime) {
+			frappe.realtime.on('erpassist_stream', (data) => {
+				this.on_stream(data);
+			});
+
+			// Replies to turns queued on a background worker
+			frappe.realtime.on('erpassist_turn', (data) => {
+				this.on_turn(data);
+			});
+		}
 	}
 
 	toggle_panel() {
@@ -124,50 +139,127 @@ erpassist.ChatPanel = class ChatPanel {
 		// Show typing indicator
 		this.show_typing();
 
+		// Stream the reply when realtime is available
+		const stream_id = frappe.realtime ? frappe.utils.get_random(10) : null;
+		if (stream_id) {
+			this.streams[stream_id] = null;
+		}
+
 		// Send to server
 		frappe.call({
 			method: 'erpassist.erpassist.api.chat.send_message',
 			args: {
 				message: message,
-				session_id: this.session_id
+				session_id: this.session_id,
+				stream_id: stream_id
 			},
 			callback: (r) => {
-				this.hide_typing();
-				
-				if (r.message && r.message.success) {
+				if (r.message && r.message.queued) {
+					// Reply arrives later on the erpassist_turn realtime event
 					this.session_id = r.message.session_id;
-					const response = r.message.response;
+					this.turns[r.message.turn_id] = stream_id;
 					
-					// Add assistant response
-					this.add_message('assistant', response.message);
-					
-					// Handle special response types
-					if (response.type === 'confirmation_required') {
-						this.show_confirmation(response);
-					} else if (response.type === 'table') {
-						this.show_table(response.data);
+					const finished = this.finished_turns[r.message.turn_id];
+					if (finished) {
+						this.on_turn(finished);
 					}
-				} else {
-					this.add_message('assistant', 'Sorry, I encountered an error. Please try again.');
+					return;
 				}
+				
+				this.on_reply(r.message, stream_id);
 			},
 			error: () => {
 				this.hide_typing();
+				this.end_stream(stream_id);
 				this.add_message('assistant', 'Sorry, I encountered an error. Please try again.');
 			}
 		});
 	}
 
+	on_reply(result, stream_id) {
+		this.hide_typing();
+		const $streamed = this.end_stream(stream_id);
+		
+		if (result && result.success) {
+			this.session_id = result.session_id;
+			const response = result.response;
+			
+			// Add assistant response, replacing the streamed text
+			if ($streamed) {
+				$streamed.find('.message-content').text(response.message || '');
+			} else {
+				this.add_message('assistant', response.message);
+			}
+			
+			// Handle special response types
+			if (response.type === 'confirmation_required') {
+				this.show_confirmation(response);
+			} else if (response.type === 'table') {
+				this.show_table(response.data);
+			} else if (response.type === 'multi') {
+				(response.results || []).forEach((result) => {
+					if (result.type === 'table' && result.data) {
+						this.show_table(result.data);
+					}
+				});
+			}
+		} else {
+			this.add_message('assistant', 'Sorry, I encountered an error. Please try again.');
+		}
+	}
+
+	on_turn(data) {
+		if (!(data.turn_id in this.turns)) {
+			// The worker can finish before send_message returns
+			this.finished_turns[data.turn_id] = data;
+			return;
+		}
+
+		const stream_id = this.turns[data.turn_id];
+		delete this.turns[data.turn_id];
+		delete this.finished_turns[data.turn_id];
+		this.on_reply(data, stream_id);
+	}
+
+	on_stream(data) {
+		if (!data.delta || !(data.stream_id in this.streams)) {
+			return;
+		}
+
+		let $message = this.streams[data.stream_id];
+		if (!$message) {
+			// First token: swap the typing indicator for the reply bubble
+			this.hide_typing();
+			$message = this.add_message('assistant', '');
+			this.streams[data.stream_id] = $message;
+		}
+
+		const $content = $message.find('.message-content');
+		$content.text($content.text() + data.delta);
+		this.scroll_to_bottom();
+	}
+
+	end_stream(stream_id) {
+		if (!stream_id) {
+			return null;
+		}
+
+		const $message = this.streams[stream_id];
+		delete this.streams[stream_id];
+		return $message;
+	}
+
 	add_message(role, content) {
 		const message_class = role === 'user' ? 'user-message' : 'assistant-message';
-		const message_html = `
+		const $message = $(`
 			<div class="chat-message ${message_class}">
 				<div class="message-content">${frappe.utils.escape_html(content)}</div>
 			</div>
-		`;
+		`);
 		
-		this.$messages.append(message_html);
+		this.$messages.append($message);
 		this.scroll_to_bottom();
+		return $message;
 	}
 
 	show_typing() {